@@ -1,14 +1,24 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
 from datetime import datetime
 import io
 import shutil
-import psycopg2
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from course_aggregates import CourseAggregates, courses_overview, overview_styles
+from image_cache import get_thumbnail_cache
+from image_pipeline import RENDITIONS, rendition_path, save_course_image
+from registration_index import RegistrationIndex, course_keys, duplicate_report
+from db_pool import create_pooled_engine, pool_stats
+from storage import Base, get_repository
+from startup import ImageDirectoryWatch, ensure_default_image
+from integrity import COURSE_STATUSES, IntegrityChecker
+from static_images import STREAMLIT_STATIC_URL, StaticImagePublisher, start_configured_server
+from validators import normalize_cpf, normalize_email, validate_cpf, validate_email
+from roster_import import import_roster, read_roster
+from waitlist import Waitlist, waitlist_path_for
+from pagination import PAGE_SIZE, PAGE_SIZE_OPTIONS, clamp_page, page_count, page_rows
+from catalog_cache import CatalogCache
+from sql_migration import migrate_to_sql
 # Remova esta linha, pois não vamos usar dotenv
 # from dotenv import load_dotenv
 
@@ -18,81 +28,93 @@ st.set_page_config(page_title="Training Portfolio", layout="wide")
 # Remova esta linha, pois não vamos usar dotenv
 # load_dotenv()
 
-# Configuração do banco de dados PostgreSQL usando secrets.toml
-try:
-    # Obter credenciais do secrets.toml
-    db_host = st.secrets["postgresql"]["host"]
-    db_port = st.secrets["postgresql"]["port"]
-    db_name = st.secrets["postgresql"]["database"]
-    db_user = st.secrets["postgresql"]["username"]
-    db_pass = st.secrets["postgresql"]["password"]
-    
-    # Imprimir informações de depuração (remova em produção)
-    st.sidebar.info(f"Tentando conectar a: {db_host}:{db_port}/{db_name} com usuário {db_user}")
-    
-    # Construir a string de conexão
-    DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-    
-    engine = create_engine(DATABASE_URL)
-    Base = declarative_base()
-    
-    # Definir modelos
-    class Course(Base):
-        __tablename__ = 'courses'
+# Engine e pool de conexões criados uma única vez por processo (não a cada rerun);
+# o schema também é criado só nesse momento. Ajustes do pool em [storage.pool] nos secrets.
+@st.cache_resource
+def get_engine(database_url):
+    pool_options = dict(st.secrets.get("storage", {}).get("pool", {}))
+    engine = create_pooled_engine(database_url, **pool_options)
+    # Criar tabelas se não existirem (modelos definidos em storage.py)
+    Base.metadata.create_all(engine)
+    return engine
+
+# Backend de armazenamento: "excel" (padrão), "parquet", "sqlite" ou "postgresql".
+# Só os backends SQL leem [postgresql] e conectam ao banco; com arquivos não há engine.
+STORAGE_BACKEND = st.secrets.get("storage", {}).get("backend", "excel")
+engine = None
+
+if STORAGE_BACKEND in ("sqlite", "postgresql"):
+    # Configuração do banco de dados usando secrets.toml
+    try:
+        if STORAGE_BACKEND == "sqlite":
+            # SQLite local como substituto do PostgreSQL
+            DATABASE_URL = f"sqlite:///{st.secrets['storage'].get('sqlite_path', 'training.db')}"
+        else:
+            # Obter credenciais do secrets.toml
+            db_host = st.secrets["postgresql"]["host"]
+            db_port = st.secrets["postgresql"]["port"]
+            db_name = st.secrets["postgresql"]["database"]
+            db_user = st.secrets["postgresql"]["username"]
+            db_pass = st.secrets["postgresql"]["password"]
+            
+            # Imprimir informações de depuração (remova em produção)
+            st.sidebar.info(f"Tentando conectar a: {db_host}:{db_port}/{db_name} com usuário {db_user}")
+            
+            # Construir a string de conexão
+            DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
         
-        id = Column(Integer, primary_key=True)
-        name = Column(String(100), nullable=False, unique=True)
-        description = Column(Text)
-        slots = Column(Integer, default=20)
-        image_path = Column(String(255))
-        registered = Column(Integer, default=0)
-        status = Column(String(20), default='open')
-    
-    class Registration(Base):
-        __tablename__ = 'registrations'
+        engine = get_engine(DATABASE_URL)
         
-        id = Column(Integer, primary_key=True)
-        course_name = Column(String(100), nullable=False)
-        name = Column(String(100), nullable=False)
-        cpf = Column(String(11), nullable=False)
-        email = Column(String(100), nullable=False)
-        company = Column(String(100))
-        registration_date = Column(DateTime, default=datetime.now)
-    
-    # Criar tabelas se não existirem
-    Base.metadata.create_all(engine)
-    
-    # Criar sessão
-    Session = sessionmaker(bind=engine)
-    
-    st.sidebar.success("Conexão com o banco de dados estabelecida com sucesso!")
-except Exception as e:
-    st.sidebar.error(f"Erro ao conectar ao banco de dados: {e}")
-    st.stop()  # Parar execução se não conectar ao PostgreSQL
+        st.sidebar.success("Conexão com o banco de dados estabelecida com sucesso!")
+    except Exception as e:
+        st.sidebar.error(f"Erro ao conectar ao banco de dados: {e}")
+        st.stop()  # Parar execução se o backend SQL não conectar
 
 # Default image configuration
 DEFAULT_IMAGE = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images\\default_course.png"
-if not os.path.exists(DEFAULT_IMAGE):
-    img = Image.new('RGB', (400, 300), color='gray')
-    img.save(DEFAULT_IMAGE)
 
-# Modificar a função get_course_image para redimensionar as imagens
-def get_course_image(image_path):
+# Cursos por página na Library ([library] page_size nos secrets)
+LIBRARY_PAGE_SIZE = int(st.secrets.get("library", {}).get("page_size", PAGE_SIZE))
+
+# Modificar a função get_course_image para redimensionar as imagens (com cache)
+def get_course_image(image_path, rendition='card'):
     try:
+        # Versão gerada no upload (card 400x300, thumb ou detail)
+        path = rendition_path(image_path, rendition)
+        if path:
+            return path
         if os.path.exists(image_path):
-            # Abrir a imagem e redimensionar para um tamanho padrão
-            img = Image.open(image_path)
-            # Definir tamanho padrão (proporções semelhantes ao card do NR 06)
-            img = img.resize((400, 300), Image.LANCZOS)
-            
-            # Criar um arquivo temporário para a imagem redimensionada
-            temp_path = os.path.join(IMAGES_DIR, "temp_" + os.path.basename(image_path))
-            img.save(temp_path)
-            return temp_path
+            # Banners antigos: miniatura em tamanho padrão servida pelo cache
+            # (sem trabalho do PIL quando o cache já está aquecido)
+            width, height, _ = RENDITIONS[rendition]
+            thumbnails = get_thumbnail_cache(os.path.join(IMAGES_DIR, ".thumbnails"))
+            return thumbnails.get(image_path, (width, height))
         return DEFAULT_IMAGE
     except Exception:
         return DEFAULT_IMAGE
 
+# Banners publicados como arquivos estáticos com o hash do conteúdo no nome: os cards
+# passam só a URL e o navegador reaproveita a imagem entre reruns e visitas
+# ([static_images] port, host e base_url nos secrets: servidor próprio com cache de longo prazo)
+STATIC_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "banners")
+
+@st.cache_resource
+def get_image_publisher():
+    config = st.secrets.get("static_images", {})
+    if "port" in config:
+        base_url = start_configured_server(STATIC_IMAGES_DIR, config)
+    else:
+        base_url = f"{STREAMLIT_STATIC_URL}/banners"
+    return StaticImagePublisher(STATIC_IMAGES_DIR, base_url)
+
+def course_image_url(image_path, rendition='card'):
+    path = get_course_image(image_path, rendition)
+    try:
+        # Versões e miniaturas seguem a versão do banner (sem recalcular o hash a cada render)
+        return get_image_publisher().url(path, source=image_path if path != DEFAULT_IMAGE else None)
+    except OSError:
+        return path
+
 # Initialize session state
 if 'current_course' not in st.session_state:
     st.session_state.current_course = None
@@ -102,23 +124,55 @@ COURSES_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\courses.xlsx"
 REGISTRATIONS_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\registrations.xlsx"
 IMAGES_DIR = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images"
 
-# Create images directory if it doesn't exist
-os.makedirs(IMAGES_DIR, exist_ok=True)
-
-# Funções para interagir com o banco de dados PostgreSQL
-@st.cache_data
+def library_page(active_courses_df):
+    # Paginação da grade da Library no servidor: retorna só os cursos da página atual
+    options = sorted(set(PAGE_SIZE_OPTIONS) | {LIBRARY_PAGE_SIZE})
+    page_size = st.sidebar.selectbox("Cursos por página", options,
+                                     index=options.index(LIBRARY_PAGE_SIZE), key="library_page_size")
+    total = len(active_courses_df)
+    page = clamp_page(st.session_state.get('library_page', 1), total, page_size)
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    if prev_col.button("◀ Anterior", key="library_prev"):
+        page = clamp_page(page - 1, total, page_size)
+    if next_col.button("Próxima ▶", key="library_next"):
+        page = clamp_page(page + 1, total, page_size)
+    st.session_state.library_page = page
+    info_col.caption(f"Página {page} de {page_count(total, page_size)} · {total} cursos")
+    return page_rows(active_courses_df, page, page_size)
+
+# Preparação feita uma vez por processo (não a cada rerun): diretório de imagens,
+# imagem padrão e o monitor que decide quando revalidar os banners
+@st.cache_resource
+def bootstrap():
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    ensure_default_image(DEFAULT_IMAGE)
+    return ImageDirectoryWatch(IMAGES_DIR)
+
+image_watch = bootstrap()
+
+# Repositório de dados (Excel, Parquet, SQLite ou PostgreSQL) escolhido pela configuração,
+# também um por processo
+@st.cache_resource
+def get_storage_repository():
+    return get_repository(STORAGE_BACKEND, COURSES_DB, REGISTRATIONS_DB, engine=engine)
+
+repository = get_storage_repository()
+
+# Cache do catálogo de cursos, um por processo, invalidado a cada escrita
+@st.cache_resource
+def get_course_catalog():
+    return CatalogCache(repository)
+
+course_catalog = get_course_catalog()
+
+# Funções para interagir com o repositório de dados
 def load_or_create_courses_db():
-    # Usar diretamente o Excel em vez de tentar o PostgreSQL
-    return migrate_courses_db()
+    return course_catalog.get()
 
 def save_course(name, description, slots, image_file):
-    # Save image to file
-    image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-    with open(image_path, 'wb') as f:
-        f.write(image_file)
+    # Normalizar o upload e gerar as versões (thumb, card, detail) em WebP
+    image_path = save_course_image(image_file, IMAGES_DIR, name)
     
-    # Salvar diretamente no Excel
-    df = migrate_courses_db()
     new_course = {
         'name': name,
         'description': description,
@@ -127,19 +181,46 @@ def save_course(name, description, slots, image_file):
         'registered': 0,
         'status': 'open'
     }
-    df = pd.concat([df, pd.DataFrame([new_course])], ignore_index=True)
-    df.to_excel(COURSES_DB, index=False)
+    repository.add_course(new_course)
+    course_catalog.invalidate()
 
 def load_or_create_registrations_db():
-    # Usar diretamente o Excel
-    if os.path.exists(REGISTRATIONS_DB):
-        return pd.read_excel(REGISTRATIONS_DB)
-    return pd.DataFrame(columns=['course_name', 'name', 'cpf', 'email', 'company', 'registration_date'])
+    return repository.load_registrations()
+
+# Agregados por empresa/dia: um group-by por processo, depois atualização incremental
+@st.cache_resource
+def get_course_aggregates():
+    return CourseAggregates.from_registrations(load_or_create_registrations_db())
 
-def save_registration(course_name, name, cpf, email, company):
-    # Salvar diretamente no Excel
-    df = load_or_create_registrations_db()
+def course_ids_by_name():
+    courses_df = load_or_create_courses_db()
+    return dict(zip(courses_df['name'], courses_df['id']))
+
+# Índices (curso, cpf) e (curso, email) para detectar inscrição duplicada no envio
+@st.cache_resource
+def get_registration_index():
+    return RegistrationIndex.from_registrations(load_or_create_registrations_db(), course_ids_by_name())
+
+def save_registration(course_id, course_name, name, cpf, email, company):
+    # CPF (só dígitos) e email (minúsculas, sem espaços) gravados sempre na forma normalizada
+    cpf = normalize_cpf(cpf)
+    email = normalize_email(email)
+    # Verificar duplicidade em O(1) antes de ocupar a vaga
+    registration_index = get_registration_index()
+    duplicate = registration_index.claim(course_id, cpf, email)
+    if duplicate:
+        return False, f"Já existe uma inscrição neste curso com este {'CPF' if duplicate == 'cpf' else 'email'}."
+    
+    # Reservar a vaga de forma atômica antes de gravar a inscrição
+    reserved = repository.reserve_seat(course_id)
+    # Mesmo sem vaga o cache estava desatualizado: invalidar nos dois casos
+    course_catalog.invalidate()
+    if not reserved:
+        registration_index.release(course_id, cpf, email)
+        return False, "Este curso está com vagas esgotadas."
+    
     new_registration = {
+        'course_id': int(course_id),
         'course_name': course_name,
         'name': name,
         'cpf': cpf,
@@ -147,667 +228,220 @@ def save_registration(course_name, name, cpf, email, company):
         'company': company,
         'registration_date': datetime.now()
     }
-    df = pd.concat([df, pd.DataFrame([new_registration])], ignore_index=True)
-    df.to_excel(REGISTRATIONS_DB, index=False)
-    
-    # Update course registration count
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[courses_df['name'] == course_name, 'registered'] += 1
-    courses_df.to_excel(COURSES_DB, index=False)
-
-def update_course(idx, name, description, slots, image_path, registered, status, new_image=None):
-    # Atualizar diretamente no Excel
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[idx, 'name'] = name
-    courses_df.loc[idx, 'description'] = description
-    courses_df.loc[idx, 'slots'] = slots
-    courses_df.loc[idx, 'status'] = status
-    
-    if new_image:
-        image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-        with open(image_path, 'wb') as f:
-            f.write(new_image)
-        courses_df.loc[idx, 'image_path'] = image_path
-    
-    courses_df.to_excel(COURSES_DB, index=False)
-    return True
-
-def delete_course(name):
-    # Excluir diretamente do Excel
-    courses_df = load_or_create_courses_db()
-    course = courses_df[courses_df['name'] == name]
-    
-    if not course.empty:
-        # Verificar se há alunos registrados
-        if course['status'].iloc[0] == 'open' and course['registered'].iloc[0] > 0:
-            return False, "Não é possível excluir um curso ativo com alunos registrados"
-        
-        # Excluir imagem
-        if os.path.exists(course['image_path'].iloc[0]):
-            os.remove(course['image_path'].iloc[0])
-        
-        # Excluir curso
-        courses_df = courses_df[courses_df['name'] != name]
-        courses_df.to_excel(COURSES_DB, index=False)
-        return True, "Curso excluído com sucesso"
-    else:
-        return False, "Curso não encontrado"
-
-# Função para migrar dados do Excel para PostgreSQL (executar uma vez)
-def migrate_data_to_postgresql():
-    if st.sidebar.button("Migrar dados para PostgreSQL", key="btn_migrate_data_1"):
-        try:
-            # Migrar cursos
-            if os.path.exists(COURSES_DB):
-                excel_courses = pd.read_excel(COURSES_DB)
-                session = Session()
-                
-                for _, row in excel_courses.iterrows():
-                    # Verificar se o curso já existe
-                    existing = session.query(Course).filter_by(name=row['name']).first()
-                    if not existing:
-                        new_course = Course(
-                            name=row['name'],
-                            description=row['description'],
-                            slots=row['slots'],
-                            image_path=row['image_path'],
-                            registered=row['registered'],
-                            status=row['status'] if 'status' in row else 'open'
-                        )
-                        session.add(new_course)
-                
-                # Migrar registros
-                if os.path.exists(REGISTRATIONS_DB):
-                    excel_regs = pd.read_excel(REGISTRATIONS_DB)
-                    
-                    for _, row in excel_regs.iterrows():
-                        new_reg = Registration(
-                            course_name=row['course_name'],
-                            name=row['name'],
-                            cpf=row['cpf'],
-                            email=row['email'],
-                            company=row['company'],
-                            registration_date=row['registration_date']
-                        )
-                        session.add(new_reg)
-                
-                session.commit()
-                session.close()
-                st.sidebar.success("Dados migrados com sucesso!")
+    repository.add_registration(new_registration)
+    # Quem estava na lista de espera deste curso e se inscreveu direto sai da fila
+    get_waitlist().leave(course_id, [new_registration])
+    get_course_aggregates().record_registration(course_name, company, new_registration['registration_date'])
+    return True, None
+
+# Lista de espera por curso, compartilhada entre as sessões do processo
+@st.cache_resource
+def get_waitlist():
+    return Waitlist(waitlist_path_for(REGISTRATIONS_DB))
+
+def promote_waitlist(course_id):
+    # Vagas liberadas (mais vagas no curso ou inscrição cancelada) vão para a lista
+    # de espera, em ordem de chegada
+    # Os promovidos entram no índice de duplicidade dentro da própria promoção
+    promoted = get_waitlist().promote(repository, course_id, registration_index=get_registration_index())
+    if promoted:
+        get_course_aggregates().record_registrations(pd.DataFrame(promoted))
+        course_catalog.invalidate()
+    return promoted
+
+def waitlist_form(course):
+    # Curso esgotado: entrar na lista de espera em vez de perder a inscrição
+    waitlist = get_waitlist()
+    st.info(f"Pessoas na lista de espera: {waitlist.size(course['id'])}")
+    with st.form("waitlist_form"):
+        name = st.text_input("Nome Completo")
+        cpf = st.text_input("CPF (apenas números)")
+        email = st.text_input("Email")
+        company = st.text_input("Empresa")
+
+        if st.form_submit_button("Entrar na lista de espera"):
+            if not name or not cpf or not email or not company:
+                st.error("Por favor, preencha todos os campos.")
+            elif not validate_cpf(cpf):
+                st.error("CPF inválido. Por favor, verifique o número informado.")
+            elif not validate_email(email):
+                st.error("Email inválido. Por favor, verifique o formato.")
+            elif get_registration_index().find(course['id'], cpf, email):
+                st.error("Já existe uma inscrição neste curso com este CPF ou email.")
             else:
-                st.sidebar.warning("Nenhum arquivo Excel encontrado para migração.")
-        except Exception as e:
-            st.sidebar.error(f"Erro durante a migração: {e}")
-
-# Função para limpar cursos com imagens inválidas
-def clean_invalid_courses():
-    # Limpar cursos com imagens inválidas diretamente do Excel
-    try:
-        courses_df = load_or_create_courses_db()
-        rows_to_drop = []
-        
-        for idx, course in courses_df.iterrows():
-            if not os.path.exists(course['image_path']):
-                rows_to_drop.append(idx)
-        
-        if rows_to_drop:
-            courses_df = courses_df.drop(rows_to_drop)
-            courses_df.to_excel(COURSES_DB, index=False)
-        
-        return True
-    except Exception:
-        return False
-
-# Limpar cursos com imagens inválidas
-if clean_invalid_courses():
-    st.warning("Alguns cursos com imagens inválidas foram removidos.")
-
-# Função para migrar o banco de dados Excel (mantida para compatibilidade)
-def migrate_courses_db():
-    if os.path.exists(COURSES_DB):
-        df = pd.read_excel(COURSES_DB)
-        if 'status' not in df.columns:
-            df['status'] = 'open'  # Set default status for existing courses
-            df.to_excel(COURSES_DB, index=False)
-        return df
-    return pd.DataFrame(columns=['name', 'description', 'slots', 'image_path', 'registered', 'status'])
-
-# Comentar temporariamente a opção para migrar dados
-# migrate_data_to_postgresql()
-
-# Ajustar a seção do menu de navegação
-st.sidebar.title("Navigation")
-
-# Botão para a Biblioteca
-if st.sidebar.button("Library", use_container_width=True):
-    st.session_state.page = "Library"
-    # Forçar recarregamento para garantir que a autenticação seja verificada
-    st.rerun()
-
-# Seção de Management com autenticação única
-with st.sidebar.expander("Management"):
-    # Verificar autenticação para a área administrativa
-    if 'authenticated_admin_area' not in st.session_state:
-        st.session_state.authenticated_admin_area = False
-    
-    if not st.session_state.authenticated_admin_area:
-        with st.form("auth_form_admin_area"):
-            password = st.text_input("Enter admin password", type="password")
-            if st.form_submit_button("Login"):
-                if password == st.secrets["admin_password"]:
-                    st.session_state.authenticated_admin_area = True
-                    st.rerun()
+                position = waitlist.join(course['id'], {
+                    'course_name': course['name'],
+                    'name': name,
+                    'cpf': cpf,
+                    'email': email,
+                    'company': company,
+                })
+                if position is None:
+                    st.error("Você já está na lista de espera deste curso.")
                 else:
-                    st.error("Incorrect password")
+                    st.success(f"Você entrou na lista de espera na posição {position}.")
+
+def cancel_registration(course_id, cpf, email):
+    # Inscrição e contador de vagas alterados na mesma operação; a vaga liberada vai
+    # para a lista de espera
+    cancelled = repository.cancel_registration(course_id, cpf, email)
+    if cancelled:
+        get_registration_index().release(course_id, cpf, email)
+        get_course_aggregates().remove_registrations(pd.DataFrame(cancelled))
+        course_catalog.invalidate()
+        promote_waitlist(course_id)
+    return cancelled
+
+def transfer_registration(course_id, cpf, email, target_course_id):
+    # ValueError quando o destino está esgotado ou já tem a pessoa inscrita
+    moved, registration = repository.transfer_registration(course_id, cpf, email, target_course_id)
+    registration_index = get_registration_index()
+    registration_index.release(course_id, cpf, email)
+    registration_index.claim(target_course_id, registration['cpf'], registration['email'])
+    course_aggregates = get_course_aggregates()
+    course_aggregates.remove_registrations(pd.DataFrame(moved))
+    course_aggregates.record_registration(registration['course_name'], registration['company'], registration['registration_date'])
+    course_catalog.invalidate()
+    promote_waitlist(course_id)
+    return registration
+
+def reconcile_counters():
+    # Recalcula as vagas ocupadas de todos os cursos com um único group-by; cursos cujo
+    # contador estava alto liberam vagas para a lista de espera
+    report = repository.reconcile_registered()
+    course_catalog.invalidate()
+    for course_id in report.loc[report['actual'] < report['registered'], 'id']:
+        promote_waitlist(course_id)
+    return report
+
+# Detalhe do curso e formulário de inscrição como fragmento: interagir com o formulário
+# reexecuta só este trecho (dados do curso, vagas e formulário), não a grade da Library
+@st.fragment
+def course_detail(course_id):
+    # Encontrar o curso selecionado (busca O(1) pelo id no índice do catálogo)
+    selected_course = course_catalog.get_course_by_id(course_id)
+
+    # Verificar se o curso ainda existe
+    if selected_course is None:
+        st.error("O curso selecionado não foi encontrado. Ele pode ter sido excluído.")
+        st.session_state.current_course = None
+        st.rerun()
     else:
-        # Botões para as seções administrativas
-        if st.button("Course Management", key="btn_course_mgmt", use_container_width=True):
-            st.session_state.page = "Course Management"
-            st.rerun()
-        
-        if st.button("Admin Dashboard", key="btn_admin_dash", use_container_width=True):
-            st.session_state.page = "Admin Dashboard"
-            st.rerun()
-
-# Inicializar a página padrão se não existir
-if 'page' not in st.session_state:
-    st.session_state.page = "Library"
-
-# Usar st.session_state.page em vez de page
-page = st.session_state.page
-
-# Manter a autenticação da biblioteca
-if 'authenticated_library' not in st.session_state:
-    st.session_state.authenticated_library = False
-
-# Agora vamos ajustar as seções de conteúdo para garantir que funcionem corretamente
-
-# Modificar a seção da Library para manter a autenticação
-if page == "Library":
-    if not st.session_state.authenticated_library:
-        with st.form("auth_form"):
-            password = st.text_input("Enter password", type="password")
-            if st.form_submit_button("Login"):
-                if password == st.secrets["user_password"]:
-                    st.session_state.authenticated_library = True
-                    st.rerun()
-                else:
-                    st.error("Incorrect password")
-    else:
-        st.title("Training Library")
-        # Filter only open courses
-        courses_df = load_or_create_courses_db()
-        active_courses_df = courses_df[courses_df['status'] == 'open']
-        
-        # Na seção da Library, onde os cursos são exibidos e o botão "Saiba Mais" é definido
-        # Display courses in grid
-        cols = st.columns(3)
-        for idx, course in active_courses_df.iterrows():
-            with cols[idx % 3]:
-                # Create card
-                with st.container():
-                    try:
-                        if course['registered'] >= course['slots']:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
-                            st.markdown(
-                                "<div style='background-color: rgba(255, 0, 0, 0.1); padding: 5px; border-radius: 5px; text-align: center; color: red;'>ESGOTADO</div>",
-                                unsafe_allow_html=True)
-                        else:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
-                    except Exception:
-                        st.image(DEFAULT_IMAGE, use_container_width=True)
-                    
-                    st.subheader(course['name'])
-                    st.write(f"Vagas disponíveis: {course['slots'] - course['registered']}")
-                    
-                    # Modificar o botão "Saiba Mais"
-                    if st.button(f"Saiba Mais", key=f"learn_more_{idx}"):
-                        st.session_state.current_course = course['name']
-                        st.rerun()
-
-        # Registration form
-        if st.session_state.current_course:
-            # Encontrar o curso selecionado
-            filtered_courses = courses_df[courses_df['name'] == st.session_state.current_course]
-            
-            # Verificar se o curso ainda existe
-            if filtered_courses.empty:
-                st.error(f"O curso '{st.session_state.current_course}' não foi encontrado. Ele pode ter sido excluído.")
+        st.markdown("---")
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            st.header(f"Inscrição para {selected_course['name']}")
+        with col2:
+            if st.button("✖ Fechar", type="secondary"):
                 st.session_state.current_course = None
                 st.rerun()
-            else:
-                selected_course = filtered_courses.iloc[0]
-                
-                st.markdown("---")
-                col1, col2 = st.columns([8, 2])
-                with col1:
-                    st.header(f"Inscrição para {selected_course['name']}")
-                with col2:
-                    if st.button("✖ Fechar", type="secondary"):
-                        st.session_state.current_course = None
-                        st.rerun()
-                
-                st.markdown(f"""
-                **Descrição do Curso:**  
-                {selected_course['description']}
-                
-                **Vagas disponíveis:** {selected_course['slots'] - selected_course['registered']} de {selected_course['slots']}
-                """)
-                
-                if selected_course['registered'] < selected_course['slots']:
-                    def validate_cpf(cpf):
-                        cpf = ''.join(filter(str.isdigit, cpf))
-                        if len(cpf) != 11:
-                            return False
-                        # Calculate verification digits
-                        numbers = [int(digit) for digit in cpf][:9]
-                        prod_sum = sum((10 - i) * num for i, num in enumerate(numbers))
-                        first_digit = (prod_sum * 10) % 11 % 10
-                        numbers.append(first_digit)
-                        prod_sum = sum((11 - i) * num for i, num in enumerate(numbers))
-                        second_digit = (prod_sum * 10) % 11 % 10
-                        return cpf[-2:] == f'{first_digit}{second_digit}'
-                    
-                    def validate_email(email):
-                        import re
-                        pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-                        return re.match(pattern, email) is not None
-                    
-                    with st.form("registration_form"):
-                        name = st.text_input("Nome Completo")
-                        cpf = st.text_input("CPF (apenas números)")
-                        email = st.text_input("Email")
-                        company = st.text_input("Empresa")
-                        
-                        if st.form_submit_button("Inscrever-se"):
-                            if not name or not cpf or not email or not company:
-                                st.error("Por favor, preencha todos os campos.")
-                            elif not validate_cpf(cpf):
-                                st.error("CPF inválido. Por favor, insira 11 dígitos.")
-                            elif not validate_email(email):
-                                st.error("Email inválido. Por favor, verifique o formato.")
-                            else:
-                                save_registration(selected_course['name'], name, cpf, email, company)
-                                st.success(f"Inscrição realizada com sucesso para {selected_course['name']}!")
-                                st.session_state.current_course = None
-                                st.rerun()
-                        else:
-                            st.error("Este curso está com vagas esgotadas.")
 
-# Modificar a seção de Course Management para verificar a autenticação da área administrativa
-elif page == "Course Management":
-    if not st.session_state.authenticated_admin_area:
-        st.warning("Por favor, faça login na área de Management no menu lateral.")
-    else:
-        st.title("Course Management")
-        
-        # Add tabs for Create and Manage courses
-        tab1, tab2 = st.tabs(["Create New Course", "Manage Existing Courses"])
-        
-        with tab1:
-            with st.form("course_form"):
-                name = st.text_input("Course Name")
-                description = st.text_area("Course Description")
-                slots = st.number_input("Available Slots", min_value=1, value=20)
-                image_file = st.file_uploader("Course Banner", type=['png', 'jpg', 'jpeg'])
-                
-                if st.form_submit_button("Save Course"):
-                    if name and description and image_file:
-                        save_course(name, description, slots, image_file.getvalue())
-                        st.success("Course saved successfully!")
+        course_info = st.empty()
+
+        if selected_course['registered'] < selected_course['slots']:
+            with st.form("registration_form"):
+                name = st.text_input("Nome Completo")
+                cpf = st.text_input("CPF (apenas números)")
+                email = st.text_input("Email")
+                company = st.text_input("Empresa")
+
+                if st.form_submit_button("Inscrever-se"):
+                    if not name or not cpf or not email or not company:
+                        st.error("Por favor, preencha todos os campos.")
+                    elif not validate_cpf(cpf):
+                        st.error("CPF inválido. Por favor, verifique o número informado.")
+                    elif not validate_email(email):
+                        st.error("Email inválido. Por favor, verifique o formato.")
                     else:
-                        st.error("Please fill all fields")
-        
-        with tab2:
-            courses_df = load_or_create_courses_db()
-            if not courses_df.empty:
-                for idx, course in courses_df.iterrows():
-                    # Garantir que status seja uma string
-                    status = str(course['status']).upper() if pd.notna(course['status']) else 'OPEN'
-                    with st.expander(f"📚 {course['name']} ({status})"):
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            new_name = st.text_input("Course Name", course['name'], key=f"name_{idx}")
-                            new_description = st.text_area("Description", course['description'], key=f"desc_{idx}")
-                            new_slots = st.number_input("Slots", min_value=course['registered'], value=course['slots'], key=f"slots_{idx}")
-                            new_image = st.file_uploader("Update Banner", type=['png', 'jpg', 'jpeg'], key=f"img_{idx}")
-                            new_status = st.selectbox("Status", ['open', 'completed'], 
-                                                    index=0 if course['status'] == 'open' else 1,
-                                                    key=f"status_{idx}")
-                        
-                        with col2:
-                            st.image(course['image_path'], use_container_width=True)
-                            
-                            if st.button("Update", key=f"update_{idx}"):
-                                courses_df.loc[idx, 'name'] = new_name
-                                courses_df.loc[idx, 'description'] = new_description
-                                courses_df.loc[idx, 'slots'] = new_slots
-                                courses_df.loc[idx, 'status'] = new_status
-                                
-                                if new_image:
-                                    image_path = os.path.join(IMAGES_DIR, f"{new_name.replace(' ', '_')}.png")
-                                    with open(image_path, 'wb') as f:
-                                        f.write(new_image.getvalue())
-                                    courses_df.loc[idx, 'image_path'] = image_path
-                                
-                                courses_df.to_excel(COURSES_DB, index=False)
-                                st.success("Course updated successfully!")
-                                st.rerun()
-                            
-                            if st.button("Delete", type="secondary", key=f"delete_{idx}"):
-                                if course['status'] == 'open' and course['registered'] > 0:
-                                    st.error("Cannot delete active course with registered students")
-                                else:
-                                    # Delete image file
-                                    if os.path.exists(course['image_path']):
-                                        os.remove(course['image_path'])
-                                    # Remove from DataFrame
-                                    courses_df = courses_df.drop(idx)
-                                    courses_df.to_excel(COURSES_DB, index=False)
-                                    st.success("Course deleted successfully!")
-                                    st.rerun()
-            else:
-                st.info("No courses available to manage")
-
-# Modificar a seção de Admin Dashboard para verificar a autenticação da área administrativa
-elif page == "Admin Dashboard":
-    if not st.session_state.authenticated_admin_area:
-        st.warning("Por favor, faça login na área de Management no menu lateral.")
-    else:
-        st.title("Administrative Dashboard")
-        
-        courses_df = load_or_create_courses_db()
-        registrations_df = load_or_create_registrations_db()
-        
-        # Display courses statistics
-        st.header("Courses Overview")
-        
-        # Calculate remaining slots
-        courses_df['remaining_slots'] = courses_df['slots'] - courses_df['registered']
-        
-        # Display as a formatted table
-        st.dataframe(
-            courses_df[['name', 'slots', 'registered', 'remaining_slots', 'status']].style
-            .apply(lambda x: ['background-color: #ff4444; color: white; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             if x['remaining_slots'] == 0 
-                             else 'background-color: #4CAF50; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             for i in x], axis=1)
-            .format({
-                'slots': '{:,.0f}',
-                'registered': '{:,.0f}',
-                'remaining_slots': '{:,.0f}'
-            })
-            .set_properties(**{
-                'text-align': 'center',
-                'font-weight': 'bold',
-                'border': '1px solid gray'
-            }),
-            hide_index=True,
-            column_config={
-                "name": "Course Name",
-                "slots": "Total Slots",
-                "registered": "Registered Students",
-                "remaining_slots": "Available Slots",
-                "status": "Status"
-            },
-            use_container_width=True
-        )
-
-# Configuração do banco de dados PostgreSQL
-
-try:
-    # Obter credenciais do secrets.toml
-    db_host = st.secrets["postgresql"]["host"]
-    db_port = st.secrets["postgresql"]["port"]
-    db_name = st.secrets["postgresql"]["database"]
-    db_user = st.secrets["postgresql"]["username"]
-    db_pass = st.secrets["postgresql"]["password"]
-    
-    # Imprimir informações de depuração (remova em produção)
-    st.sidebar.info(f"Tentando conectar a: {db_host}:{db_port}/{db_name} com usuário {db_user}")
-    
-    # Construir a string de conexão
-    DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-    
-    engine = create_engine(DATABASE_URL)
-    Base = declarative_base()
-    
-    # Definir modelos
-    class Course(Base):
-        __tablename__ = 'courses'
-        
-        id = Column(Integer, primary_key=True)
-        name = Column(String(100), nullable=False, unique=True)
-        description = Column(Text)
-        slots = Column(Integer, default=20)
-        image_path = Column(String(255))
-        registered = Column(Integer, default=0)
-        status = Column(String(20), default='open')
-    
-    class Registration(Base):
-        __tablename__ = 'registrations'
-        
-        id = Column(Integer, primary_key=True)
-        course_name = Column(String(100), nullable=False)
-        name = Column(String(100), nullable=False)
-        cpf = Column(String(11), nullable=False)
-        email = Column(String(100), nullable=False)
-        company = Column(String(100))
-        registration_date = Column(DateTime, default=datetime.now)
-    
-    # Criar tabelas se não existirem
-    Base.metadata.create_all(engine)
-    
-    # Criar sessão
-    Session = sessionmaker(bind=engine)
-    
-    st.sidebar.success("Conexão com o banco de dados estabelecida com sucesso!")
-except Exception as e:
-    st.sidebar.error(f"Erro ao conectar ao banco de dados: {e}")
-    st.stop()  # Parar execução se não conectar ao PostgreSQL
-
-# Default image configuration
-DEFAULT_IMAGE = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images\\default_course.png"
-if not os.path.exists(DEFAULT_IMAGE):
-    img = Image.new('RGB', (400, 300), color='gray')
-    img.save(DEFAULT_IMAGE)
-
-# Modificar a função get_course_image para redimensionar as imagens
-def get_course_image(image_path):
-    try:
-        if os.path.exists(image_path):
-            # Abrir a imagem e redimensionar para um tamanho padrão
-            img = Image.open(image_path)
-            # Definir tamanho padrão (proporções semelhantes ao card do NR 06)
-            img = img.resize((400, 300), Image.LANCZOS)
-            
-            # Criar um arquivo temporário para a imagem redimensionada
-            temp_path = os.path.join(IMAGES_DIR, "temp_" + os.path.basename(image_path))
-            img.save(temp_path)
-            return temp_path
-        return DEFAULT_IMAGE
-    except Exception:
-        return DEFAULT_IMAGE
-
-# Initialize session state
-if 'current_course' not in st.session_state:
-    st.session_state.current_course = None
-
-# File paths
-COURSES_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\courses.xlsx"
-REGISTRATIONS_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\registrations.xlsx"
-IMAGES_DIR = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images"
+                        saved, message = save_registration(selected_course['id'], selected_course['name'], name, cpf, email, company)
+                        if saved:
+                            st.success(f"Inscrição realizada com sucesso para {selected_course['name']}!")
+                            selected_course = course_catalog.get_course_by_id(course_id)
+                        else:
+                            st.error(message)
+        else:
+            st.error("Este curso está com vagas esgotadas.")
+            waitlist_form(selected_course)
 
-# Create images directory if it doesn't exist
-os.makedirs(IMAGES_DIR, exist_ok=True)
+        # Dados e vagas escritos depois do envio do formulário, já com a nova inscrição
+        course_info.markdown(f"""
+        **Descrição do Curso:**  
+        {selected_course['description']}
 
-# Funções para interagir com o banco de dados PostgreSQL
-@st.cache_data
-def load_or_create_courses_db():
-    # Usar diretamente o Excel em vez de tentar o PostgreSQL
-    return migrate_courses_db()
+        **Vagas disponíveis:** {selected_course['slots'] - selected_course['registered']} de {selected_course['slots']}
+        """)
 
-def save_course(name, description, slots, image_file):
-    # Save image to file
-    image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-    with open(image_path, 'wb') as f:
-        f.write(image_file)
-    
-    # Salvar diretamente no Excel
-    df = migrate_courses_db()
-    new_course = {
+def update_course(course_id, name, description, slots, image_path, registered, status, new_image=None):
+    changes = {
         'name': name,
         'description': description,
         'slots': slots,
-        'image_path': image_path,
-        'registered': 0,
-        'status': 'open'
-    }
-    df = pd.concat([df, pd.DataFrame([new_course])], ignore_index=True)
-    df.to_excel(COURSES_DB, index=False)
-
-def load_or_create_registrations_db():
-    # Usar diretamente o Excel
-    if os.path.exists(REGISTRATIONS_DB):
-        return pd.read_excel(REGISTRATIONS_DB)
-    return pd.DataFrame(columns=['course_name', 'name', 'cpf', 'email', 'company', 'registration_date'])
-
-def save_registration(course_name, name, cpf, email, company):
-    # Salvar diretamente no Excel
-    df = load_or_create_registrations_db()
-    new_registration = {
-        'course_name': course_name,
-        'name': name,
-        'cpf': cpf,
-        'email': email,
-        'company': company,
-        'registration_date': datetime.now()
+        'status': status
     }
-    df = pd.concat([df, pd.DataFrame([new_registration])], ignore_index=True)
-    df.to_excel(REGISTRATIONS_DB, index=False)
-    
-    # Update course registration count
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[courses_df['name'] == course_name, 'registered'] += 1
-    courses_df.to_excel(COURSES_DB, index=False)
-
-def update_course(idx, name, description, slots, image_path, registered, status, new_image=None):
-    # Atualizar diretamente no Excel
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[idx, 'name'] = name
-    courses_df.loc[idx, 'description'] = description
-    courses_df.loc[idx, 'slots'] = slots
-    courses_df.loc[idx, 'status'] = status
     
     if new_image:
-        image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-        with open(image_path, 'wb') as f:
-            f.write(new_image)
-        courses_df.loc[idx, 'image_path'] = image_path
+        changes['image_path'] = save_course_image(new_image, IMAGES_DIR, name)
     
-    courses_df.to_excel(COURSES_DB, index=False)
-    return True
+    updated = repository.update_course(course_id, changes)
+    course_catalog.invalidate()
+    if updated:
+        # Mais vagas (ou curso reaberto): promover quem está na lista de espera
+        promote_waitlist(course_id)
+    return updated
 
-def delete_course(name):
-    # Excluir diretamente do Excel
-    courses_df = load_or_create_courses_db()
-    course = courses_df[courses_df['name'] == name]
+def delete_course(course_id):
+    course = course_catalog.get_course_by_id(course_id)
     
-    if not course.empty:
+    if course is not None:
         # Verificar se há alunos registrados
-        if course['status'].iloc[0] == 'open' and course['registered'].iloc[0] > 0:
+        if course['status'] == 'open' and course['registered'] > 0:
             return False, "Não é possível excluir um curso ativo com alunos registrados"
         
-        # Excluir imagem
-        if os.path.exists(course['image_path'].iloc[0]):
-            os.remove(course['image_path'].iloc[0])
-        
-        # Excluir curso
-        courses_df = courses_df[courses_df['name'] != name]
-        courses_df.to_excel(COURSES_DB, index=False)
+        # Excluir curso; o banner é recolhido depois pela verificação de integridade
+        repository.delete_course(course_id)
+        course_catalog.invalidate()
         return True, "Curso excluído com sucesso"
     else:
         return False, "Curso não encontrado"
 
 # Função para migrar dados do Excel para PostgreSQL (executar uma vez)
 def migrate_data_to_postgresql():
+    if engine is None:
+        return
     if st.sidebar.button("Migrar dados para PostgreSQL", key="btn_migrate_data_1"):
         try:
-            # Migrar cursos
             if os.path.exists(COURSES_DB):
-                excel_courses = pd.read_excel(COURSES_DB)
-                session = Session()
+                # Inserções em lote com ON CONFLICT DO NOTHING; pode ser executada de novo
+                # após uma interrupção sem duplicar dados
+                progress_bar = st.sidebar.progress(0.0)
                 
-                for _, row in excel_courses.iterrows():
-                    # Verificar se o curso já existe
-                    existing = session.query(Course).filter_by(name=row['name']).first()
-                    if not existing:
-                        new_course = Course(
-                            name=row['name'],
-                            description=row['description'],
-                            slots=row['slots'],
-                            image_path=row['image_path'],
-                            registered=row['registered'],
-                            status=row['status'] if 'status' in row else 'open'
-                        )
-                        session.add(new_course)
+                def report_progress(table, done, total):
+                    progress_bar.progress(done / total, text=f"{table}: {done}/{total}")
                 
-                # Migrar registros
-                if os.path.exists(REGISTRATIONS_DB):
-                    excel_regs = pd.read_excel(REGISTRATIONS_DB)
-                    
-                    for _, row in excel_regs.iterrows():
-                        new_reg = Registration(
-                            course_name=row['course_name'],
-                            name=row['name'],
-                            cpf=row['cpf'],
-                            email=row['email'],
-                            company=row['company'],
-                            registration_date=row['registration_date']
-                        )
-                        session.add(new_reg)
-                
-                session.commit()
-                session.close()
-                st.sidebar.success("Dados migrados com sucesso!")
+                summary = migrate_to_sql(engine, COURSES_DB, REGISTRATIONS_DB, progress=report_progress)
+                st.sidebar.success(f"Dados migrados com sucesso! {summary['courses']} cursos e "
+                                   f"{summary['registrations']} inscrições inseridos.")
             else:
                 st.sidebar.warning("Nenhum arquivo Excel encontrado para migração.")
         except Exception as e:
             st.sidebar.error(f"Erro durante a migração: {e}")
 
-# Função para limpar cursos com imagens inválidas
-def clean_invalid_courses():
-    # Limpar cursos com imagens inválidas diretamente do Excel
-    try:
-        courses_df = load_or_create_courses_db()
-        rows_to_drop = []
-        
-        for idx, course in courses_df.iterrows():
-            if not os.path.exists(course['image_path']):
-                rows_to_drop.append(idx)
-        
-        if rows_to_drop:
-            courses_df = courses_df.drop(rows_to_drop)
-            courses_df.to_excel(COURSES_DB, index=False)
-        
-        return True
-    except Exception:
-        return False
+# Verificação de integridade em segundo plano: cursos sem banner vão para quarentena e
+# imagens órfãs/temporárias são removidas fora do caminho da renderização
+@st.cache_resource
+def get_integrity_checker():
+    return IntegrityChecker(repository, IMAGES_DIR, protected=[DEFAULT_IMAGE], static_dir=STATIC_IMAGES_DIR,
+                            on_change=course_catalog.invalidate).start()
 
-# Limpar cursos com imagens inválidas
-if clean_invalid_courses():
-    st.warning("Alguns cursos com imagens inválidas foram removidos.")
+integrity_checker = get_integrity_checker()
+
+# Quando as imagens ou o catálogo mudaram, antecipar a próxima verificação
+image_watch.run_if_changed(integrity_checker.wake, repository.catalog_version)
 
 # Função para migrar o banco de dados Excel (mantida para compatibilidade)
 def migrate_courses_db():
-    if os.path.exists(COURSES_DB):
-        df = pd.read_excel(COURSES_DB)
-        if 'status' not in df.columns:
-            df['status'] = 'open'  # Set default status for existing courses
-            df.to_excel(COURSES_DB, index=False)
-        return df
-    return pd.DataFrame(columns=['name', 'description', 'slots', 'image_path', 'registered', 'status'])
+    # A coluna 'status' é adicionada pelo repositório ao carregar os cursos
+    return repository.load_courses()
 
 # Comentar temporariamente a opção para migrar dados
 # migrate_data_to_postgresql()
@@ -816,7 +450,7 @@ def migrate_courses_db():
 st.sidebar.title("Navigation")
 
 # Botão para a Biblioteca
-if st.sidebar.button("Library", key="btn_library_1", use_container_width=True):
+if st.sidebar.button("Library", use_container_width=True):
     st.session_state.page = "Library"
     # Forçar recarregamento para garantir que a autenticação seja verificada
     st.rerun()
@@ -878,19 +512,20 @@ if page == "Library":
         
         # Na seção da Library, onde os cursos são exibidos e o botão "Saiba Mais" é definido
         # Display courses in grid
+        visible_courses_df = library_page(active_courses_df)
         cols = st.columns(3)
-        for idx, course in active_courses_df.iterrows():
-            with cols[idx % 3]:
+        for position, (_, course) in enumerate(visible_courses_df.iterrows()):
+            with cols[position % 3]:
                 # Create card
                 with st.container():
                     try:
                         if course['registered'] >= course['slots']:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                             st.markdown(
                                 "<div style='background-color: rgba(255, 0, 0, 0.1); padding: 5px; border-radius: 5px; text-align: center; color: red;'>ESGOTADO</div>",
                                 unsafe_allow_html=True)
                         else:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                     except Exception:
                         st.image(DEFAULT_IMAGE, use_container_width=True)
                     
@@ -898,78 +533,12 @@ if page == "Library":
                     st.write(f"Vagas disponíveis: {course['slots'] - course['registered']}")
                     
                     # Modificar o botão "Saiba Mais"
-                    if st.button(f"Saiba Mais", key=f"learn_more_{idx}"):
-                        st.session_state.current_course = course['name']
-                        st.rerun()
+                    if st.button(f"Saiba Mais", key=f"learn_more_{course['id']}"):
+                        st.session_state.current_course = int(course['id'])
 
         # Registration form
         if st.session_state.current_course:
-            # Encontrar o curso selecionado
-            filtered_courses = courses_df[courses_df['name'] == st.session_state.current_course]
-            
-            # Verificar se o curso ainda existe
-            if filtered_courses.empty:
-                st.error(f"O curso '{st.session_state.current_course}' não foi encontrado. Ele pode ter sido excluído.")
-                st.session_state.current_course = None
-                st.rerun()
-            else:
-                selected_course = filtered_courses.iloc[0]
-                
-                st.markdown("---")
-                col1, col2 = st.columns([8, 2])
-                with col1:
-                    st.header(f"Inscrição para {selected_course['name']}")
-                with col2:
-                    if st.button("✖ Fechar", type="secondary"):
-                        st.session_state.current_course = None
-                        st.rerun()
-                
-                st.markdown(f"""
-                **Descrição do Curso:**  
-                {selected_course['description']}
-                
-                **Vagas disponíveis:** {selected_course['slots'] - selected_course['registered']} de {selected_course['slots']}
-                """)
-                
-                if selected_course['registered'] < selected_course['slots']:
-                    def validate_cpf(cpf):
-                        cpf = ''.join(filter(str.isdigit, cpf))
-                        if len(cpf) != 11:
-                            return False
-                        # Calculate verification digits
-                        numbers = [int(digit) for digit in cpf][:9]
-                        prod_sum = sum((10 - i) * num for i, num in enumerate(numbers))
-                        first_digit = (prod_sum * 10) % 11 % 10
-                        numbers.append(first_digit)
-                        prod_sum = sum((11 - i) * num for i, num in enumerate(numbers))
-                        second_digit = (prod_sum * 10) % 11 % 10
-                        return cpf[-2:] == f'{first_digit}{second_digit}'
-                    
-                    def validate_email(email):
-                        import re
-                        pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-                        return re.match(pattern, email) is not None
-                    
-                    with st.form("registration_form"):
-                        name = st.text_input("Nome Completo")
-                        cpf = st.text_input("CPF (apenas números)")
-                        email = st.text_input("Email")
-                        company = st.text_input("Empresa")
-                        
-                        if st.form_submit_button("Inscrever-se"):
-                            if not name or not cpf or not email or not company:
-                                st.error("Por favor, preencha todos os campos.")
-                            elif not validate_cpf(cpf):
-                                st.error("CPF inválido. Por favor, insira 11 dígitos.")
-                            elif not validate_email(email):
-                                st.error("Email inválido. Por favor, verifique o formato.")
-                            else:
-                                save_registration(selected_course['name'], name, cpf, email, company)
-                                st.success(f"Inscrição realizada com sucesso para {selected_course['name']}!")
-                                st.session_state.current_course = None
-                                st.rerun()
-                        else:
-                            st.error("Este curso está com vagas esgotadas.")
+            course_detail(st.session_state.current_course)
 
 # Modificar a seção de Course Management para verificar a autenticação da área administrativa
 elif page == "Course Management":
@@ -979,7 +548,7 @@ elif page == "Course Management":
         st.title("Course Management")
         
         # Add tabs for Create and Manage courses
-        tab1, tab2 = st.tabs(["Create New Course", "Manage Existing Courses"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Create New Course", "Manage Existing Courses", "Import Roster", "Registrations"])
         
         with tab1:
             with st.form("course_form"):
@@ -1005,48 +574,115 @@ elif page == "Course Management":
                         col1, col2 = st.columns([3, 1])
                         
                         with col1:
-                            new_name = st.text_input("Course Name", course['name'], key=f"name_{idx}")
-                            new_description = st.text_area("Description", course['description'], key=f"desc_{idx}")
-                            new_slots = st.number_input("Slots", min_value=course['registered'], value=course['slots'], key=f"slots_{idx}")
-                            new_image = st.file_uploader("Update Banner", type=['png', 'jpg', 'jpeg'], key=f"img_{idx}")
-                            new_status = st.selectbox("Status", ['open', 'completed'], 
-                                                    index=0 if course['status'] == 'open' else 1,
-                                                    key=f"status_{idx}")
+                            new_name = st.text_input("Course Name", course['name'], key=f"name_{course['id']}")
+                            new_description = st.text_area("Description", course['description'], key=f"desc_{course['id']}")
+                            new_slots = st.number_input("Slots", min_value=course['registered'], value=course['slots'], key=f"slots_{course['id']}")
+                            new_image = st.file_uploader("Update Banner", type=['png', 'jpg', 'jpeg'], key=f"img_{course['id']}")
+                            new_status = st.selectbox("Status", COURSE_STATUSES, 
+                                                    index=COURSE_STATUSES.index(course['status']) if course['status'] in COURSE_STATUSES else 0,
+                                                    key=f"status_{course['id']}")
                         
                         with col2:
-                            st.image(course['image_path'], use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                             
-                            if st.button("Update", key=f"update_{idx}"):
-                                courses_df.loc[idx, 'name'] = new_name
-                                courses_df.loc[idx, 'description'] = new_description
-                                courses_df.loc[idx, 'slots'] = new_slots
-                                courses_df.loc[idx, 'status'] = new_status
-                                
-                                if new_image:
-                                    image_path = os.path.join(IMAGES_DIR, f"{new_name.replace(' ', '_')}.png")
-                                    with open(image_path, 'wb') as f:
-                                        f.write(new_image.getvalue())
-                                    courses_df.loc[idx, 'image_path'] = image_path
-                                
-                                courses_df.to_excel(COURSES_DB, index=False)
+                            if st.button("Update", key=f"update_{course['id']}"):
+                                update_course(course['id'], new_name, new_description, new_slots,
+                                              course['image_path'], course['registered'], new_status,
+                                              new_image.getvalue() if new_image else None)
                                 st.success("Course updated successfully!")
                                 st.rerun()
                             
-                            if st.button("Delete", type="secondary", key=f"delete_{idx}"):
-                                if course['status'] == 'open' and course['registered'] > 0:
-                                    st.error("Cannot delete active course with registered students")
-                                else:
-                                    # Delete image file
-                                    if os.path.exists(course['image_path']):
-                                        os.remove(course['image_path'])
-                                    # Remove from DataFrame
-                                    courses_df = courses_df.drop(idx)
-                                    courses_df.to_excel(COURSES_DB, index=False)
+                            if st.button("Delete", type="secondary", key=f"delete_{course['id']}"):
+                                deleted, message = delete_course(course['id'])
+                                if deleted:
                                     st.success("Course deleted successfully!")
                                     st.rerun()
+                                else:
+                                    st.error(message)
             else:
                 st.info("No courses available to manage")
 
+        with tab3:
+            # Inscrição em lote da lista enviada pela empresa: validação vetorizada da lista
+            # inteira, vagas reservadas de uma vez e inscrições gravadas numa única escrita
+            courses_df = load_or_create_courses_db()
+            open_courses = courses_df[courses_df['status'] == 'open']
+            if open_courses.empty:
+                st.info("No open courses available")
+            else:
+                course_names = dict(zip(open_courses['id'], open_courses['name']))
+                with st.form("roster_import_form"):
+                    roster_course_id = st.selectbox("Course", list(course_names), format_func=course_names.get)
+                    roster_file = st.file_uploader("Roster (columns: nome, cpf, email, empresa)", type=['csv', 'xlsx'])
+                    submitted = st.form_submit_button("Import Roster")
+                if submitted and roster_file is not None:
+                    course = open_courses[open_courses['id'] == roster_course_id].iloc[0]
+                    try:
+                        roster = read_roster(roster_file.getvalue(), roster_file.name)
+                        imported, errors = import_roster(repository, course, roster,
+                                                         course_ids=course_ids_by_name(), registration_index=get_registration_index())
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        course_catalog.invalidate()
+                        get_course_aggregates().record_registrations(imported)
+                        get_waitlist().leave(course['id'], imported.to_dict('records'))
+                        if not imported.empty:
+                            st.success(f"{len(imported)} registrations imported into {course['name']}.")
+                        if not errors.empty:
+                            st.warning(f"{len(errors)} rows were not imported:")
+                            st.dataframe(errors, use_container_width=True, hide_index=True)
+
+        with tab4:
+            # Cancelamento e transferência: inscrição e contadores de vagas alterados juntos
+            courses_df = load_or_create_courses_db()
+            if courses_df.empty:
+                st.info("No courses available")
+            else:
+                course_names = dict(zip(courses_df['id'], courses_df['name']))
+                registrations_course_id = st.selectbox("Course", list(course_names), format_func=course_names.get,
+                                                       key="registrations_course")
+                registrations_df = load_or_create_registrations_db()
+                if not registrations_df.empty:
+                    registrations_df = registrations_df[(course_keys(registrations_df, course_ids_by_name()) == registrations_course_id).to_numpy()]
+                if registrations_df.empty:
+                    st.info("No registrations for this course")
+                else:
+                    labels = {position: f"{row['name']} ({row['cpf']}, {row['email']})"
+                              for position, row in registrations_df.iterrows()}
+                    selected = st.selectbox("Registration", list(labels), format_func=labels.get)
+                    registration = registrations_df.loc[selected]
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("Cancel Registration", type="secondary"):
+                            cancel_registration(registrations_course_id, registration['cpf'], registration['email'])
+                            st.success(f"Registration of {registration['name']} cancelled.")
+                            st.rerun()
+                    with col2:
+                        targets = {course_id: name for course_id, name in course_names.items()
+                                   if course_id != registrations_course_id}
+                        target_course_id = st.selectbox("Transfer to", list(targets), format_func=targets.get)
+                        if st.button("Transfer Registration") and target_course_id is not None:
+                            try:
+                                transfer_registration(registrations_course_id, registration['cpf'], registration['email'],
+                                                      target_course_id)
+                            except ValueError as e:
+                                st.error(str(e))
+                            else:
+                                st.success(f"{registration['name']} transferred to {targets[target_course_id]}.")
+                                st.rerun()
+
+            # Contadores de vagas recalculados a partir das inscrições
+            st.divider()
+            if st.button("Reconcile Counters"):
+                report = reconcile_counters()
+                if report.empty:
+                    st.success("All course counters match the registrations.")
+                else:
+                    st.warning(f"{len(report)} course counters corrected:")
+                    st.dataframe(report, use_container_width=True, hide_index=True,
+                                 column_config={"name": "Course Name", "registered": "Before", "actual": "Registered Students"})
+
 # Modificar a seção de Admin Dashboard para verificar a autenticação da área administrativa
 elif page == "Admin Dashboard":
     if not st.session_state.authenticated_admin_area:
@@ -1060,20 +696,18 @@ elif page == "Admin Dashboard":
         # Display courses statistics
         st.header("Courses Overview")
         
-        # Calculate remaining slots
-        courses_df['remaining_slots'] = courses_df['slots'] - courses_df['registered']
+        # Vagas restantes e taxa de ocupação calculadas de forma vetorizada
+        overview_df = courses_overview(courses_df)
         
-        # Display as a formatted table
+        # Display as a formatted table (estilo aplicado em uma única chamada para a tabela inteira)
         st.dataframe(
-            courses_df[['name', 'slots', 'registered', 'remaining_slots', 'status']].style
-            .apply(lambda x: ['background-color: #ff4444; color: white; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             if x['remaining_slots'] == 0 
-                             else 'background-color: #4CAF50; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             for i in x], axis=1)
+            overview_df.style
+            .apply(overview_styles, axis=None)
             .format({
                 'slots': '{:,.0f}',
                 'registered': '{:,.0f}',
-                'remaining_slots': '{:,.0f}'
+                'remaining_slots': '{:,.0f}',
+                'fill_ratio': '{:.0%}'
             })
             .set_properties(**{
                 'text-align': 'center',
@@ -1086,335 +720,58 @@ elif page == "Admin Dashboard":
                 "slots": "Total Slots",
                 "registered": "Registered Students",
                 "remaining_slots": "Available Slots",
+                "fill_ratio": "Occupancy",
                 "status": "Status"
             },
             use_container_width=True
         )
-
-# Configuração do banco de dados PostgreSQL
-
-try:
-    # Obter credenciais do secrets.toml
-    db_host = st.secrets["postgresql"]["host"]
-    db_port = st.secrets["postgresql"]["port"]
-    db_name = st.secrets["postgresql"]["database"]
-    db_user = st.secrets["postgresql"]["username"]
-    db_pass = st.secrets["postgresql"]["password"]
-    
-    # Imprimir informações de depuração (remova em produção)
-    st.sidebar.info(f"Tentando conectar a: {db_host}:{db_port}/{db_name} com usuário {db_user}")
-    
-    # Construir a string de conexão
-    DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-    
-    engine = create_engine(DATABASE_URL)
-    Base = declarative_base()
-    
-    # Definir modelos
-    class Course(Base):
-        __tablename__ = 'courses'
         
-        id = Column(Integer, primary_key=True)
-        name = Column(String(100), nullable=False, unique=True)
-        description = Column(Text)
-        slots = Column(Integer, default=20)
-        image_path = Column(String(255))
-        registered = Column(Integer, default=0)
-        status = Column(String(20), default='open')
-    
-    class Registration(Base):
-        __tablename__ = 'registrations'
-        
-        id = Column(Integer, primary_key=True)
-        course_name = Column(String(100), nullable=False)
-        name = Column(String(100), nullable=False)
-        cpf = Column(String(11), nullable=False)
-        email = Column(String(100), nullable=False)
-        company = Column(String(100))
-        registration_date = Column(DateTime, default=datetime.now)
-    
-    # Criar tabelas se não existirem
-    Base.metadata.create_all(engine)
-    
-    # Criar sessão
-    Session = sessionmaker(bind=engine)
-    
-    st.sidebar.success("Conexão com o banco de dados estabelecida com sucesso!")
-except Exception as e:
-    st.sidebar.error(f"Erro ao conectar ao banco de dados: {e}")
-    st.stop()  # Parar execução se não conectar ao PostgreSQL
-
-# Default image configuration
-DEFAULT_IMAGE = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images\\default_course.png"
-if not os.path.exists(DEFAULT_IMAGE):
-    img = Image.new('RGB', (400, 300), color='gray')
-    img.save(DEFAULT_IMAGE)
-
-# Modificar a função get_course_image para redimensionar as imagens
-def get_course_image(image_path):
-    try:
-        if os.path.exists(image_path):
-            # Abrir a imagem e redimensionar para um tamanho padrão
-            img = Image.open(image_path)
-            # Definir tamanho padrão (proporções semelhantes ao card do NR 06)
-            img = img.resize((400, 300), Image.LANCZOS)
-            
-            # Criar um arquivo temporário para a imagem redimensionada
-            temp_path = os.path.join(IMAGES_DIR, "temp_" + os.path.basename(image_path))
-            img.save(temp_path)
-            return temp_path
-        return DEFAULT_IMAGE
-    except Exception:
-        return DEFAULT_IMAGE
-
-# Initialize session state
-if 'current_course' not in st.session_state:
-    st.session_state.current_course = None
-
-# File paths
-COURSES_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\courses.xlsx"
-REGISTRATIONS_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\registrations.xlsx"
-IMAGES_DIR = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images"
-
-# Create images directory if it doesn't exist
-os.makedirs(IMAGES_DIR, exist_ok=True)
-
-# Funções para interagir com o banco de dados PostgreSQL
-@st.cache_data
-def load_or_create_courses_db():
-    # Usar diretamente o Excel em vez de tentar o PostgreSQL
-    return migrate_courses_db()
-
-def save_course(name, description, slots, image_file):
-    # Save image to file
-    image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-    with open(image_path, 'wb') as f:
-        f.write(image_file)
-    
-    # Salvar diretamente no Excel
-    df = migrate_courses_db()
-    new_course = {
-        'name': name,
-        'description': description,
-        'slots': slots,
-        'image_path': image_path,
-        'registered': 0,
-        'status': 'open'
-    }
-    df = pd.concat([df, pd.DataFrame([new_course])], ignore_index=True)
-    df.to_excel(COURSES_DB, index=False)
-
-def load_or_create_registrations_db():
-    # Usar diretamente o Excel
-    if os.path.exists(REGISTRATIONS_DB):
-        return pd.read_excel(REGISTRATIONS_DB)
-    return pd.DataFrame(columns=['course_name', 'name', 'cpf', 'email', 'company', 'registration_date'])
-
-def save_registration(course_name, name, cpf, email, company):
-    # Salvar diretamente no Excel
-    df = load_or_create_registrations_db()
-    new_registration = {
-        'course_name': course_name,
-        'name': name,
-        'cpf': cpf,
-        'email': email,
-        'company': company,
-        'registration_date': datetime.now()
-    }
-    df = pd.concat([df, pd.DataFrame([new_registration])], ignore_index=True)
-    df.to_excel(REGISTRATIONS_DB, index=False)
-    
-    # Update course registration count
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[courses_df['name'] == course_name, 'registered'] += 1
-    courses_df.to_excel(COURSES_DB, index=False)
-
-def update_course(idx, name, description, slots, image_path, registered, status, new_image=None):
-    # Atualizar diretamente no Excel
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[idx, 'name'] = name
-    courses_df.loc[idx, 'description'] = description
-    courses_df.loc[idx, 'slots'] = slots
-    courses_df.loc[idx, 'status'] = status
-    
-    if new_image:
-        image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-        with open(image_path, 'wb') as f:
-            f.write(new_image)
-        courses_df.loc[idx, 'image_path'] = image_path
-    
-    courses_df.to_excel(COURSES_DB, index=False)
-    return True
-
-def delete_course(name):
-    # Excluir diretamente do Excel
-    courses_df = load_or_create_courses_db()
-    course = courses_df[courses_df['name'] == name]
-    
-    if not course.empty:
-        # Verificar se há alunos registrados
-        if course['status'].iloc[0] == 'open' and course['registered'].iloc[0] > 0:
-            return False, "Não é possível excluir um curso ativo com alunos registrados"
-        
-        # Excluir imagem
-        if os.path.exists(course['image_path'].iloc[0]):
-            os.remove(course['image_path'].iloc[0])
-        
-        # Excluir curso
-        courses_df = courses_df[courses_df['name'] != name]
-        courses_df.to_excel(COURSES_DB, index=False)
-        return True, "Curso excluído com sucesso"
-    else:
-        return False, "Curso não encontrado"
-
-# Função para migrar dados do Excel para PostgreSQL (executar uma vez)
-def migrate_data_to_postgresql():
-    if st.sidebar.button("Migrar dados para PostgreSQL", key="btn_migrate_data_2"):
-        try:
-            # Migrar cursos
-            if os.path.exists(COURSES_DB):
-                excel_courses = pd.read_excel(COURSES_DB)
-                session = Session()
-                
-                for _, row in excel_courses.iterrows():
-                    # Verificar se o curso já existe
-                    existing = session.query(Course).filter_by(name=row['name']).first()
-                    if not existing:
-                        new_course = Course(
-                            name=row['name'],
-                            description=row['description'],
-                            slots=row['slots'],
-                            image_path=row['image_path'],
-                            registered=row['registered'],
-                            status=row['status'] if 'status' in row else 'open'
-                        )
-                        session.add(new_course)
-                
-                # Migrar registros
-                if os.path.exists(REGISTRATIONS_DB):
-                    excel_regs = pd.read_excel(REGISTRATIONS_DB)
-                    
-                    for _, row in excel_regs.iterrows():
-                        new_reg = Registration(
-                            course_name=row['course_name'],
-                            name=row['name'],
-                            cpf=row['cpf'],
-                            email=row['email'],
-                            company=row['company'],
-                            registration_date=row['registration_date']
-                        )
-                        session.add(new_reg)
-                
-                session.commit()
-                session.close()
-                st.sidebar.success("Dados migrados com sucesso!")
-            else:
-                st.sidebar.warning("Nenhum arquivo Excel encontrado para migração.")
-        except Exception as e:
-            st.sidebar.error(f"Erro durante a migração: {e}")
-
-# Função para limpar cursos com imagens inválidas
-def clean_invalid_courses():
-    # Limpar cursos com imagens inválidas diretamente do Excel
-    try:
-        courses_df = load_or_create_courses_db()
-        rows_to_drop = []
-        
-        for idx, course in courses_df.iterrows():
-            if not os.path.exists(course['image_path']):
-                rows_to_drop.append(idx)
-        
-        if rows_to_drop:
-            courses_df = courses_df.drop(rows_to_drop)
-            courses_df.to_excel(COURSES_DB, index=False)
-        
-        return True
-    except Exception:
-        return False
-
-# Limpar cursos com imagens inválidas
-if clean_invalid_courses():
-    st.warning("Alguns cursos com imagens inválidas foram removidos.")
-
-# Função para migrar o banco de dados Excel (mantida para compatibilidade)
-def migrate_courses_db():
-    if os.path.exists(COURSES_DB):
-        df = pd.read_excel(COURSES_DB)
-        if 'status' not in df.columns:
-            df['status'] = 'open'  # Set default status for existing courses
-            df.to_excel(COURSES_DB, index=False)
-        return df
-    return pd.DataFrame(columns=['name', 'description', 'slots', 'image_path', 'registered', 'status'])
-
-# Comentar temporariamente a opção para migrar dados
-# migrate_data_to_postgresql()
-
-# Ajustar a seção do menu de navegação
-st.sidebar.title("Navigation")
-
-# Botão para a Biblioteca
-if st.sidebar.button("Library", key="btn_library_2", use_container_width=True):
-    st.session_state.page = "Library"
-    # Forçar recarregamento para garantir que a autenticação seja verificada
-    st.rerun()
-
-# Seção de Management com autenticação única
-with st.sidebar.expander("Management"):
-    # Verificar autenticação para a área administrativa
-    if 'authenticated_admin_area' not in st.session_state:
-        st.session_state.authenticated_admin_area = False
-    
-    if not st.session_state.authenticated_admin_area:
-        with st.form("auth_form_admin_area"):
-            password = st.text_input("Enter admin password", type="password")
-            if st.form_submit_button("Login"):
-                if password == st.secrets["admin_password"]:
-                    st.session_state.authenticated_admin_area = True
-                    st.rerun()
+        # Inscrições por empresa e por dia (agregados atualizados a cada inscrição)
+        course_aggregates = get_course_aggregates()
+        with st.expander("Inscrições por empresa e por dia"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(course_aggregates.company_table(), hide_index=True, use_container_width=True,
+                             column_config={"course_name": "Curso", "company": "Empresa", "registrations": "Inscrições"})
+            with col2:
+                st.dataframe(course_aggregates.daily_table(), hide_index=True, use_container_width=True,
+                             column_config={"course_name": "Curso", "day": "Dia", "registrations": "Inscrições"})
+        
+        # Relatório de inscrições duplicadas (mesmo CPF ou email no mesmo curso), gerado sob demanda
+        with st.expander("Inscrições duplicadas"):
+            if st.button("Gerar relatório de duplicidades"):
+                duplicates_df = duplicate_report(load_or_create_registrations_db(), course_ids_by_name())
+                if duplicates_df.empty:
+                    st.success("Nenhuma inscrição duplicada encontrada.")
                 else:
-                    st.error("Incorrect password")
-    else:
-        # Botões para as seções administrativas
-        if st.button("Course Management", key="btn_course_mgmt", use_container_width=True):
-            st.session_state.page = "Course Management"
-            st.rerun()
-        
-        if st.button("Admin Dashboard", key="btn_admin_dash", use_container_width=True):
-            st.session_state.page = "Admin Dashboard"
-            st.rerun()
-
-# Inicializar a página padrão se não existir
-if 'page' not in st.session_state:
-    st.session_state.page = "Library"
-
-# Usar st.session_state.page em vez de page
-page = st.session_state.page
-
-# Manter a autenticação da biblioteca
-if 'authenticated_library' not in st.session_state:
-    st.session_state.authenticated_library = False
-
-# Agora vamos ajustar as seções de conteúdo para garantir que funcionem corretamente
-
-# Modificar a seção da Library para manter a autenticação
-if page == "Library":
-    if not st.session_state.authenticated_library:
-        with st.form("auth_form"):
-            password = st.text_input("Enter password", type="password")
-            if st.form_submit_button("Login"):
-                if password == st.secrets["user_password"]:
-                    st.session_state.authenticated_library = True
-                    st.rerun()
-                else:
-                    st.error("Incorrect password")
-    else:
-        st.title("Training Library")
-        # Filter only open courses
-        courses_df = load_or_create_courses_db()
-        active_courses_df = courses_df[courses_df['status'] == 'open']
-        
-        # Na seção da Library, onde os cursos são exibidos e o botão "Saiba Mais" é definido
-        # Display courses in grid
-        cols = st.columns(3)
-        for idx, course in active_courses_df.iterrows():
-            with cols[idx % 3]:
\ No newline at end of file
+                    st.dataframe(duplicates_df, hide_index=True, use_container_width=True,
+                                 column_config={"course_name": "Curso", "duplicate_on": "Duplicado em"})
+        
+        # Último relatório da verificação de integridade em segundo plano
+        with st.expander("Manutenção de imagens"):
+            integrity_report = integrity_checker.last_report
+            if integrity_report is None:
+                st.info("A primeira verificação ainda está em andamento.")
+            elif 'error' in integrity_report:
+                st.error(f"Falha na verificação de {integrity_report['checked_at']:%d/%m/%Y %H:%M}: {integrity_report['error']}")
+            else:
+                st.write(f"Última verificação: {integrity_report['checked_at']:%d/%m/%Y %H:%M}")
+                st.write(f"Cursos em quarentena: {', '.join(integrity_report['quarantined']) or 'nenhum'}")
+                st.write(f"Arquivos removidos: {len(integrity_report['removed_files'])} "
+                         f"({integrity_report['freed_bytes'] / 1024:.0f} KB liberados)")
+                for error in integrity_report['errors']:
+                    st.warning(error)
+            if st.button("Verificar agora"):
+                integrity_checker.wake()
+        
+        # Métricas do cache do catálogo
+        catalog_stats = course_catalog.stats()
+        st.caption(f"Cache do catálogo: {catalog_stats['hits']} acertos, {catalog_stats['misses']} falhas "
+                   f"({catalog_stats['hit_ratio']:.0%}), geração {catalog_stats['generation']}")
+        
+        # Métricas do pool de conexões, para dimensionar pool_size/max_overflow (só backends SQL)
+        if engine is not None:
+            pool_metrics = pool_stats(engine)
+            st.caption(f"Pool do banco: {pool_metrics['checked_out']} conexões em uso, {pool_metrics['checked_in']} ociosas, "
+                       f"overflow {pool_metrics['overflow']}/{pool_metrics['max_overflow']} (pool_size {pool_metrics['size']}), "
+                       f"{pool_metrics['waits']} esperas por pool esgotado ({pool_metrics['wait_time']:.2f}s)")
@@ -1,37 +1,66 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
 from datetime import datetime
-import io
 import shutil
+from catalog_cache import CatalogCache
+from course_aggregates import CourseAggregates, courses_overview, overview_styles
+from image_cache import get_thumbnail_cache
+from image_pipeline import RENDITIONS, rendition_path, save_course_image
+from registration_index import RegistrationIndex, course_keys, duplicate_report
+from registration_export import EXPORT_FORMATS, deferred_export
+from registration_log import append_registration, convert_snapshot_to_parquet, load_registrations, query_registrations, registered_course_names
+from storage import COURSE_COLUMNS, ExcelRepository
+from startup import ImageDirectoryWatch, ensure_default_image
+from integrity import COURSE_STATUSES, IntegrityChecker
+from static_images import STREAMLIT_STATIC_URL, StaticImagePublisher
+from validators import normalize_cpf, normalize_email, validate_cpf, validate_email
+from roster_import import import_roster, read_roster
+from waitlist import Waitlist, waitlist_path_for
+from pagination import PAGE_SIZE, PAGE_SIZE_OPTIONS, clamp_page, page_count, page_rows
 
 # Configure page - DEVE SER O PRIMEIRO COMANDO STREAMLIT
 st.set_page_config(page_title="Training Portfolio", layout="wide")
 
 # Default image configuration
 DEFAULT_IMAGE = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images\\default_course.png"
-if not os.path.exists(DEFAULT_IMAGE):
-    img = Image.new('RGB', (400, 300), color='gray')
-    img.save(DEFAULT_IMAGE)
 
-# Modificar a função get_course_image para redimensionar as imagens
-def get_course_image(image_path):
+# Cursos por página na Library
+LIBRARY_PAGE_SIZE = PAGE_SIZE
+
+# Modificar a função get_course_image para redimensionar as imagens (com cache)
+def get_course_image(image_path, rendition='card'):
     try:
+        # Versão gerada no upload (card 400x300, thumb ou detail)
+        path = rendition_path(image_path, rendition)
+        if path:
+            return path
         if os.path.exists(image_path):
-            # Abrir a imagem e redimensionar para um tamanho padrão
-            img = Image.open(image_path)
-            # Definir tamanho padrão (proporções semelhantes ao card do NR 06)
-            img = img.resize((400, 300), Image.LANCZOS)
-            
-            # Criar um arquivo temporário para a imagem redimensionada
-            temp_path = os.path.join(IMAGES_DIR, "temp_" + os.path.basename(image_path))
-            img.save(temp_path)
-            return temp_path
+            # Banners antigos: miniatura em tamanho padrão servida pelo cache
+            # (sem trabalho do PIL quando o cache já está aquecido)
+            width, height, _ = RENDITIONS[rendition]
+            thumbnails = get_thumbnail_cache(os.path.join(IMAGES_DIR, ".thumbnails"))
+            return thumbnails.get(image_path, (width, height))
         return DEFAULT_IMAGE
     except Exception:
         return DEFAULT_IMAGE
 
+# Banners publicados como arquivos estáticos com o hash do conteúdo no nome: os cards
+# passam só a URL e o navegador reaproveita a imagem entre reruns e visitas
+STATIC_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "banners")
+
+@st.cache_resource
+def get_image_publisher():
+    return StaticImagePublisher(STATIC_IMAGES_DIR, f"{STREAMLIT_STATIC_URL}/banners")
+
+def course_image_url(image_path, rendition='card'):
+    path = get_course_image(image_path, rendition)
+    try:
+        # Versões e miniaturas seguem a versão do banner (sem recalcular o hash a cada render)
+        return get_image_publisher().url(path, source=image_path if path != DEFAULT_IMAGE else None)
+    except OSError:
+        return path
+
 # Initialize session state
 if 'current_course' not in st.session_state:
     st.session_state.current_course = None
@@ -41,56 +70,68 @@ COURSES_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\courses.xlsx"
 REGISTRATIONS_DB = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\registrations.xlsx"
 IMAGES_DIR = "c:\\WCD\\GITHUB - CODE\\Portifolio_treinamento\\images"
 
-# Create images directory if it doesn't exist
-os.makedirs(IMAGES_DIR, exist_ok=True)
+def library_page(active_courses_df):
+    # Paginação da grade da Library no servidor: retorna só os cursos da página atual
+    options = sorted(set(PAGE_SIZE_OPTIONS) | {LIBRARY_PAGE_SIZE})
+    page_size = st.sidebar.selectbox("Cursos por página", options,
+                                     index=options.index(LIBRARY_PAGE_SIZE), key="library_page_size")
+    total = len(active_courses_df)
+    page = clamp_page(st.session_state.get('library_page', 1), total, page_size)
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    if prev_col.button("◀ Anterior", key="library_prev"):
+        page = clamp_page(page - 1, total, page_size)
+    if next_col.button("Próxima ▶", key="library_next"):
+        page = clamp_page(page + 1, total, page_size)
+    st.session_state.library_page = page
+    info_col.caption(f"Página {page} de {page_count(total, page_size)} · {total} cursos")
+    return page_rows(active_courses_df, page, page_size)
 
-# No início do arquivo, após carregar as bibliotecas, adicione esta função de limpeza
-def clean_invalid_courses():
-    df = pd.read_excel(COURSES_DB)
-    invalid_courses = []
-    
-    for idx, course in df.iterrows():
-        if not os.path.exists(course['image_path']):
-            invalid_courses.append(idx)
-    
-    if invalid_courses:
-        df = df.drop(invalid_courses)
-        df.to_excel(COURSES_DB, index=False)
-        return True
-    return False
-
-# Logo após a definição de IMAGES_DIR, adicione:
-# Limpar cursos com imagens inválidas
-if os.path.exists(COURSES_DB):
-    if clean_invalid_courses():
-        st.warning("Alguns cursos com imagens inválidas foram removidos.")
+# Preparação feita uma vez por processo (não a cada rerun): diretório de imagens,
+# imagem padrão e o monitor que decide quando revalidar os banners
+@st.cache_resource
+def bootstrap():
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    ensure_default_image(DEFAULT_IMAGE)
+    return ImageDirectoryWatch(IMAGES_DIR)
+
+image_watch = bootstrap()
+
+# Inscrições em Parquet para leitura com filtros (a planilha existente é convertida na primeira execução)
+REGISTRATIONS_DB = convert_snapshot_to_parquet(REGISTRATIONS_DB)
+
+# Repositório Excel com lock de arquivo para a reserva de vagas
+repository = ExcelRepository(COURSES_DB, REGISTRATIONS_DB, course_columns=COURSE_COLUMNS + ['course_date', 'course_time', 'course_location'])
+
+# Verificação de integridade em segundo plano: cursos sem banner vão para quarentena e
+# imagens órfãs/temporárias são removidas fora do caminho da renderização
+@st.cache_resource
+def get_integrity_checker():
+    return IntegrityChecker(repository, IMAGES_DIR, protected=[DEFAULT_IMAGE], static_dir=STATIC_IMAGES_DIR).start()
+
+integrity_checker = get_integrity_checker()
+
+# Quando as imagens ou o catálogo mudaram, antecipar a próxima verificação
+image_watch.run_if_changed(integrity_checker.wake, repository.catalog_version)
 
 def migrate_courses_db():
-    if os.path.exists(COURSES_DB):
-        df = pd.read_excel(COURSES_DB)
-        if 'status' not in df.columns:
-            df['status'] = 'open'  # Set default status for existing courses
-        if 'course_date' not in df.columns:
-            df['course_date'] = None  # Adicionar campo de data
-        if 'course_time' not in df.columns:
-            df['course_time'] = None  # Adicionar campo de horário
-        if 'course_location' not in df.columns:
-            df['course_location'] = None  # Adicionar campo de local
-        df.to_excel(COURSES_DB, index=False)
-        return df
-    return pd.DataFrame(columns=['name', 'description', 'slots', 'image_path', 'registered', 'status', 'course_date', 'course_time', 'course_location'])
+    # Colunas novas são adicionadas pelo repositório (gravando sob lock só quando necessário)
+    return repository.load_courses()
+
+# Cache do catálogo com índice por nome, compartilhado por todas as páginas;
+# escritas diretas na planilha são detectadas pelo mtime do arquivo
+@st.cache_resource
+def get_course_catalog():
+    return CatalogCache(repository)
+
+course_catalog = get_course_catalog()
 
 # Replace the existing load_or_create_courses_db function with:
 def load_or_create_courses_db():
-    return migrate_courses_db()
+    return course_catalog.get()
 
 def save_course(name, description, slots, image_file, course_date=None, course_time=None, course_location=None):
-    df = load_or_create_courses_db()
-    
-    # Save image to file
-    image_path = os.path.join(IMAGES_DIR, f"{name.replace(' ', '_')}.png")
-    with open(image_path, 'wb') as f:
-        f.write(image_file)
+    # Normalizar o upload e gerar as versões (thumb, card, detail) em WebP
+    image_path = save_course_image(image_file, IMAGES_DIR, name)
     
     new_course = {
         'name': name,
@@ -103,17 +144,43 @@ def save_course(name, description, slots, image_file, course_date=None, course_t
         'course_time': course_time,
         'course_location': course_location
     }
-    df = pd.concat([df, pd.DataFrame([new_course])], ignore_index=True)
-    df.to_excel(COURSES_DB, index=False)
+    repository.add_course(new_course)
 
 def load_or_create_registrations_db():
-    if os.path.exists(REGISTRATIONS_DB):
-        return pd.read_excel(REGISTRATIONS_DB)
-    return pd.DataFrame(columns=['course_name', 'name', 'cpf', 'email', 'company', 'registration_date'])
+    # Snapshot + log de inscrições ainda não compactado
+    return load_registrations(REGISTRATIONS_DB)
+
+# Agregados por empresa/dia: um group-by por processo, depois atualização incremental
+@st.cache_resource
+def get_course_aggregates():
+    return CourseAggregates.from_registrations(load_or_create_registrations_db())
+
+def course_ids_by_name():
+    courses_df = load_or_create_courses_db()
+    return dict(zip(courses_df['name'], courses_df['id']))
+
+# Índices (curso, cpf) e (curso, email) para detectar inscrição duplicada no envio
+@st.cache_resource
+def get_registration_index():
+    return RegistrationIndex.from_registrations(load_or_create_registrations_db(), course_ids_by_name())
 
-def save_registration(course_name, name, cpf, email, company):
-    df = load_or_create_registrations_db()
+def save_registration(course_id, course_name, name, cpf, email, company):
+    # CPF (só dígitos) e email (minúsculas, sem espaços) gravados sempre na forma normalizada
+    cpf = normalize_cpf(cpf)
+    email = normalize_email(email)
+    # Verificar duplicidade em O(1) antes de ocupar a vaga
+    registration_index = get_registration_index()
+    duplicate = registration_index.claim(course_id, cpf, email)
+    if duplicate:
+        return False, f"Já existe uma inscrição neste curso com este {'CPF' if duplicate == 'cpf' else 'email'}."
+    
+    # Reservar a vaga de forma atômica antes de gravar a inscrição
+    if not repository.reserve_seat(course_id):
+        registration_index.release(course_id, cpf, email)
+        return False, "Este curso está com vagas esgotadas."
+    
     new_registration = {
+        'course_id': int(course_id),
         'course_name': course_name,
         'name': name,
         'cpf': cpf,
@@ -121,13 +188,151 @@ def save_registration(course_name, name, cpf, email, company):
         'company': company,
         'registration_date': datetime.now()
     }
-    df = pd.concat([df, pd.DataFrame([new_registration])], ignore_index=True)
-    df.to_excel(REGISTRATIONS_DB, index=False)
-    
-    # Update course registration count
-    courses_df = load_or_create_courses_db()
-    courses_df.loc[courses_df['name'] == course_name, 'registered'] += 1
-    courses_df.to_excel(COURSES_DB, index=False)
+    # Acrescentar ao log de inscrições em vez de reescrever a planilha inteira
+    append_registration(REGISTRATIONS_DB, new_registration)
+    # Quem estava na lista de espera deste curso e se inscreveu direto sai da fila
+    get_waitlist().leave(course_id, [new_registration])
+    get_course_aggregates().record_registration(course_name, company, new_registration['registration_date'])
+    return True, None
+
+# Lista de espera por curso, compartilhada entre as sessões do processo
+@st.cache_resource
+def get_waitlist():
+    return Waitlist(waitlist_path_for(REGISTRATIONS_DB))
+
+def promote_waitlist(course_id):
+    # Vagas liberadas (mais vagas no curso ou inscrição cancelada) vão para a lista
+    # de espera, em ordem de chegada
+    # Os promovidos entram no índice de duplicidade dentro da própria promoção
+    promoted = get_waitlist().promote(repository, course_id, registration_index=get_registration_index())
+    if promoted:
+        get_course_aggregates().record_registrations(pd.DataFrame(promoted))
+    return promoted
+
+def waitlist_form(course):
+    # Curso esgotado: entrar na lista de espera em vez de perder a inscrição
+    waitlist = get_waitlist()
+    st.info(f"Pessoas na lista de espera: {waitlist.size(course['id'])}")
+    with st.form("waitlist_form"):
+        name = st.text_input("Nome Completo")
+        cpf = st.text_input("CPF (apenas números)")
+        email = st.text_input("Email")
+        company = st.text_input("Empresa")
+
+        if st.form_submit_button("Entrar na lista de espera"):
+            if not name or not cpf or not email or not company:
+                st.error("Por favor, preencha todos os campos.")
+            elif not validate_cpf(cpf):
+                st.error("CPF inválido. Por favor, verifique o número informado.")
+            elif not validate_email(email):
+                st.error("Email inválido. Por favor, verifique o formato.")
+            elif get_registration_index().find(course['id'], cpf, email):
+                st.error("Já existe uma inscrição neste curso com este CPF ou email.")
+            else:
+                position = waitlist.join(course['id'], {
+                    'course_name': course['name'],
+                    'name': name,
+                    'cpf': cpf,
+                    'email': email,
+                    'company': company,
+                })
+                if position is None:
+                    st.error("Você já está na lista de espera deste curso.")
+                else:
+                    st.success(f"Você entrou na lista de espera na posição {position}.")
+
+def cancel_registration(course_id, cpf, email):
+    # Inscrição e contador de vagas alterados na mesma operação; a vaga liberada vai
+    # para a lista de espera
+    cancelled = repository.cancel_registration(course_id, cpf, email)
+    if cancelled:
+        get_registration_index().release(course_id, cpf, email)
+        get_course_aggregates().remove_registrations(pd.DataFrame(cancelled))
+        promote_waitlist(course_id)
+    return cancelled
+
+def transfer_registration(course_id, cpf, email, target_course_id):
+    # ValueError quando o destino está esgotado ou já tem a pessoa inscrita
+    moved, registration = repository.transfer_registration(course_id, cpf, email, target_course_id)
+    registration_index = get_registration_index()
+    registration_index.release(course_id, cpf, email)
+    registration_index.claim(target_course_id, registration['cpf'], registration['email'])
+    course_aggregates = get_course_aggregates()
+    course_aggregates.remove_registrations(pd.DataFrame(moved))
+    course_aggregates.record_registration(registration['course_name'], registration['company'], registration['registration_date'])
+    promote_waitlist(course_id)
+    return registration
+
+def reconcile_counters():
+    # Recalcula as vagas ocupadas de todos os cursos com um único group-by; cursos cujo
+    # contador estava alto liberam vagas para a lista de espera
+    report = repository.reconcile_registered()
+    for course_id in report.loc[report['actual'] < report['registered'], 'id']:
+        promote_waitlist(course_id)
+    return report
+
+# Detalhe do curso e formulário de inscrição como fragmento: interagir com o formulário
+# reexecuta só este trecho (dados do curso, vagas e formulário), não a grade da Library
+@st.fragment
+def course_detail(course_id):
+    # Encontrar o curso selecionado (busca O(1) pelo id no índice do catálogo)
+    selected_course = course_catalog.get_course_by_id(course_id)
+
+    # Verificar se o curso ainda existe
+    if selected_course is None:
+        st.error("O curso selecionado não foi encontrado. Ele pode ter sido excluído.")
+        st.session_state.current_course = None
+        st.rerun()
+    else:
+        st.markdown("---")
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            st.header(f"Inscrição para {selected_course['name']}")
+        with col2:
+            if st.button("✖ Fechar", type="secondary"):
+                st.session_state.current_course = None
+                st.rerun()
+
+        course_info = st.empty()
+
+        if selected_course['registered'] < selected_course['slots']:
+            with st.form("registration_form"):
+                name = st.text_input("Nome Completo")
+                cpf = st.text_input("CPF (apenas números)")
+                email = st.text_input("Email")
+                company = st.text_input("Empresa")
+
+                if st.form_submit_button("Inscrever-se"):
+                    if not name or not cpf or not email or not company:
+                        st.error("Por favor, preencha todos os campos.")
+                    elif not validate_cpf(cpf):
+                        st.error("CPF inválido. Por favor, verifique o número informado.")
+                    elif not validate_email(email):
+                        st.error("Email inválido. Por favor, verifique o formato.")
+                    else:
+                        saved, message = save_registration(selected_course['id'], selected_course['name'], name, cpf, email, company)
+                        if saved:
+                            st.success(f"Inscrição realizada com sucesso para {selected_course['name']}!")
+                            selected_course = course_catalog.get_course_by_id(course_id)
+                        else:
+                            st.error(message)
+        else:
+            st.error("Este curso está com vagas esgotadas.")
+            waitlist_form(selected_course)
+
+        # Dados e vagas escritos depois do envio do formulário, já com a nova inscrição
+        course_info.markdown(f"""
+        **Descrição do Curso:**  
+        {selected_course['description']}
+
+        **Data:** {selected_course['course_date'] if pd.notna(selected_course['course_date']) else 'A definir'}
+
+        **Horário:** {selected_course['course_time'] if pd.notna(selected_course['course_time']) else 'A definir'}
+
+        **Local:** {selected_course['course_location'] if pd.notna(selected_course['course_location']) else 'A definir'}
+
+        **Vagas disponíveis:** {selected_course['slots'] - selected_course['registered']} de {selected_course['slots']}
+        """)
 
 # Ajustar a seção do menu de navegação
 st.sidebar.title("Navigation")
@@ -195,14 +400,15 @@ if page == "Library":
         
         # Na seção da Library, onde os cursos são exibidos e o botão "Saiba Mais" é definido
         # Display courses in grid
+        visible_courses_df = library_page(active_courses_df)
         cols = st.columns(3)
-        for idx, course in active_courses_df.iterrows():
-            with cols[idx % 3]:
+        for position, (_, course) in enumerate(visible_courses_df.iterrows()):
+            with cols[position % 3]:
                 # Create card
                 with st.container():
                     try:
                         if course['registered'] >= course['slots']:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                             st.markdown("""
                                 <div style='background-color: rgba(255, 0, 0, 0.1); 
                                         padding: 5px; 
@@ -213,7 +419,7 @@ if page == "Library":
                                 </div>
                             """, unsafe_allow_html=True)
                         else:
-                            st.image(get_course_image(course['image_path']), use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                     except Exception:
                         st.image(DEFAULT_IMAGE, use_container_width=True)
                     
@@ -221,77 +427,12 @@ if page == "Library":
                     st.write(f"Vagas disponíveis: {course['slots'] - course['registered']}")
                     
                     # Modificar o botão "Saiba Mais"
-                    if st.button(f"Saiba Mais", key=f"learn_more_{idx}"):
-                        st.session_state.current_course = course['name']
-                        st.rerun()
+                    if st.button(f"Saiba Mais", key=f"learn_more_{course['id']}"):
+                        st.session_state.current_course = int(course['id'])
 
         # Registration form
         if st.session_state.current_course:
-            # Encontrar o curso selecionado
-            filtered_courses = courses_df[courses_df['name'] == st.session_state.current_course]
-            
-            # Verificar se o curso ainda existe
-            if filtered_courses.empty:
-                st.error(f"O curso '{st.session_state.current_course}' não foi encontrado. Ele pode ter sido excluído.")
-                st.session_state.current_course = None
-                st.rerun()
-            else:
-                selected_course = filtered_courses.iloc[0]
-                
-                st.markdown("---")
-                col1, col2 = st.columns([8, 2])
-                with col1:
-                    st.header(f"Inscrição para {selected_course['name']}")
-                with col2:
-                    if st.button("✖ Fechar", type="secondary"):
-                        st.session_state.current_course = None
-                        st.rerun()
-                
-                st.markdown(f"""
-                **Descrição do Curso:**  
-                {selected_course['description']}
-                
-                **Data:** {selected_course['course_date'] if pd.notna(selected_course['course_date']) else 'A definir'}
-                
-                **Horário:** {selected_course['course_time'] if pd.notna(selected_course['course_time']) else 'A definir'}
-                
-                **Local:** {selected_course['course_location'] if pd.notna(selected_course['course_location']) else 'A definir'}
-                
-                **Vagas disponíveis:** {selected_course['slots'] - selected_course['registered']} de {selected_course['slots']}
-                """)
-                
-                if selected_course['registered'] < selected_course['slots']:
-                    def validate_cpf(cpf):
-                        cpf = ''.join(filter(str.isdigit, cpf))
-                        if len(cpf) != 11:
-                            return False
-                        return True
-                    
-                    def validate_email(email):
-                        import re
-                        pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-                        return re.match(pattern, email) is not None
-                    
-                    with st.form("registration_form"):
-                        name = st.text_input("Nome Completo")
-                        cpf = st.text_input("CPF (apenas números)")
-                        email = st.text_input("Email")
-                        company = st.text_input("Empresa")
-                        
-                        if st.form_submit_button("Inscrever-se"):
-                            if not name or not cpf or not email or not company:
-                                st.error("Por favor, preencha todos os campos.")
-                            elif not validate_cpf(cpf):
-                                st.error("CPF inválido. Por favor, insira 11 dígitos.")
-                            elif not validate_email(email):
-                                st.error("Email inválido. Por favor, verifique o formato.")
-                            else:
-                                save_registration(selected_course['name'], name, cpf, email, company)
-                                st.success(f"Inscrição realizada com sucesso para {selected_course['name']}!")
-                                st.session_state.current_course = None
-                                st.rerun()
-                else:
-                    st.error("Este curso está com vagas esgotadas.")
+            course_detail(st.session_state.current_course)
 
 # Modificar a seção de Course Management para verificar a autenticação da área administrativa
 elif page == "Course Management":
@@ -301,7 +442,7 @@ elif page == "Course Management":
         st.title("Course Management")
         
         # Tabs for Create/Manage courses
-        create_tab, manage_tab = st.tabs(["Create New Course", "Manage Existing Courses"])
+        create_tab, manage_tab, import_tab, registrations_tab = st.tabs(["Create New Course", "Manage Existing Courses", "Import Roster", "Registrations"])
         
         with create_tab:
             with st.form("create_course_form"):
@@ -342,48 +483,126 @@ elif page == "Course Management":
                         col1, col2 = st.columns([3, 1])
                         
                         with col1:
-                            new_name = st.text_input("Course Name", course['name'], key=f"name_{idx}")
-                            new_description = st.text_area("Description", course['description'], key=f"desc_{idx}")
-                            new_slots = st.number_input("Slots", min_value=course['registered'], value=course['slots'], key=f"slots_{idx}")
-                            new_image = st.file_uploader("Update Banner", type=['png', 'jpg', 'jpeg'], key=f"img_{idx}")
-                            new_status = st.selectbox("Status", ['open', 'completed'], 
-                                                    index=0 if course['status'] == 'open' else 1,
-                                                    key=f"status_{idx}")
+                            new_name = st.text_input("Course Name", course['name'], key=f"name_{course['id']}")
+                            new_description = st.text_area("Description", course['description'], key=f"desc_{course['id']}")
+                            new_slots = st.number_input("Slots", min_value=course['registered'], value=course['slots'], key=f"slots_{course['id']}")
+                            new_image = st.file_uploader("Update Banner", type=['png', 'jpg', 'jpeg'], key=f"img_{course['id']}")
+                            new_status = st.selectbox("Status", COURSE_STATUSES, 
+                                                    index=COURSE_STATUSES.index(course['status']) if course['status'] in COURSE_STATUSES else 0,
+                                                    key=f"status_{course['id']}")
                         
                         with col2:
-                            st.image(course['image_path'], use_container_width=True)
+                            st.image(course_image_url(course['image_path']), use_container_width=True)
                             
-                            if st.button("Update", key=f"update_{idx}"):
-                                courses_df.loc[idx, 'name'] = new_name
-                                courses_df.loc[idx, 'description'] = new_description
-                                courses_df.loc[idx, 'slots'] = new_slots
-                                courses_df.loc[idx, 'status'] = new_status
+                            if st.button("Update", key=f"update_{course['id']}"):
+                                changes = {
+                                    'name': new_name,
+                                    'description': new_description,
+                                    'slots': new_slots,
+                                    'status': new_status
+                                }
                                 
                                 if new_image:
-                                    image_path = os.path.join(IMAGES_DIR, f"{new_name.replace(' ', '_')}.png")
-                                    with open(image_path, 'wb') as f:
-                                        f.write(new_image.getvalue())
-                                    courses_df.loc[idx, 'image_path'] = image_path
+                                    image_path = save_course_image(new_image.getvalue(), IMAGES_DIR, new_name)
+                                    changes['image_path'] = image_path
                                 
-                                courses_df.to_excel(COURSES_DB, index=False)
+                                repository.update_course(course['id'], changes)
+                                # Mais vagas (ou curso reaberto): promover quem está na lista de espera
+                                promote_waitlist(course['id'])
                                 st.success("Course updated successfully!")
                                 st.rerun()
                             
-                            if st.button("Delete", type="secondary", key=f"delete_{idx}"):
+                            if st.button("Delete", type="secondary", key=f"delete_{course['id']}"):
                                 if course['status'] == 'open' and course['registered'] > 0:
                                     st.error("Cannot delete active course with registered students")
                                 else:
-                                    # Delete image file
-                                    if os.path.exists(course['image_path']):
-                                        os.remove(course['image_path'])
-                                    # Remove from DataFrame
-                                    courses_df = courses_df.drop(idx)
-                                    courses_df.to_excel(COURSES_DB, index=False)
+                                    # Remover pelo id estável; o banner é recolhido depois pela verificação de integridade
+                                    repository.delete_course(course['id'])
                                     st.success("Course deleted successfully!")
                                     st.rerun()
             else:
                 st.info("No courses available to manage")
 
+        with import_tab:
+            # Inscrição em lote da lista enviada pela empresa: validação vetorizada da lista
+            # inteira, vagas reservadas de uma vez e inscrições gravadas numa única escrita
+            courses_df = load_or_create_courses_db()
+            open_courses = courses_df[courses_df['status'] == 'open']
+            if open_courses.empty:
+                st.info("No open courses available")
+            else:
+                course_names = dict(zip(open_courses['id'], open_courses['name']))
+                with st.form("roster_import_form"):
+                    roster_course_id = st.selectbox("Course", list(course_names), format_func=course_names.get)
+                    roster_file = st.file_uploader("Roster (columns: nome, cpf, email, empresa)", type=['csv', 'xlsx'])
+                    submitted = st.form_submit_button("Import Roster")
+                if submitted and roster_file is not None:
+                    course = open_courses[open_courses['id'] == roster_course_id].iloc[0]
+                    try:
+                        roster = read_roster(roster_file.getvalue(), roster_file.name)
+                        imported, errors = import_roster(repository, course, roster,
+                                                         course_ids=course_ids_by_name(), registration_index=get_registration_index())
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        get_course_aggregates().record_registrations(imported)
+                        get_waitlist().leave(course['id'], imported.to_dict('records'))
+                        if not imported.empty:
+                            st.success(f"{len(imported)} registrations imported into {course['name']}.")
+                        if not errors.empty:
+                            st.warning(f"{len(errors)} rows were not imported:")
+                            st.dataframe(errors, use_container_width=True, hide_index=True)
+
+        with registrations_tab:
+            # Cancelamento e transferência: inscrição e contadores de vagas alterados juntos
+            courses_df = load_or_create_courses_db()
+            if courses_df.empty:
+                st.info("No courses available")
+            else:
+                course_names = dict(zip(courses_df['id'], courses_df['name']))
+                registrations_course_id = st.selectbox("Course", list(course_names), format_func=course_names.get,
+                                                       key="registrations_course")
+                registrations_df = load_or_create_registrations_db()
+                if not registrations_df.empty:
+                    registrations_df = registrations_df[(course_keys(registrations_df, course_ids_by_name()) == registrations_course_id).to_numpy()]
+                if registrations_df.empty:
+                    st.info("No registrations for this course")
+                else:
+                    labels = {position: f"{row['name']} ({row['cpf']}, {row['email']})"
+                              for position, row in registrations_df.iterrows()}
+                    selected = st.selectbox("Registration", list(labels), format_func=labels.get)
+                    registration = registrations_df.loc[selected]
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("Cancel Registration", type="secondary"):
+                            cancel_registration(registrations_course_id, registration['cpf'], registration['email'])
+                            st.success(f"Registration of {registration['name']} cancelled.")
+                            st.rerun()
+                    with col2:
+                        targets = {course_id: name for course_id, name in course_names.items()
+                                   if course_id != registrations_course_id}
+                        target_course_id = st.selectbox("Transfer to", list(targets), format_func=targets.get)
+                        if st.button("Transfer Registration") and target_course_id is not None:
+                            try:
+                                transfer_registration(registrations_course_id, registration['cpf'], registration['email'],
+                                                      target_course_id)
+                            except ValueError as e:
+                                st.error(str(e))
+                            else:
+                                st.success(f"{registration['name']} transferred to {targets[target_course_id]}.")
+                                st.rerun()
+
+            # Contadores de vagas recalculados a partir das inscrições
+            st.divider()
+            if st.button("Reconcile Counters"):
+                report = reconcile_counters()
+                if report.empty:
+                    st.success("All course counters match the registrations.")
+                else:
+                    st.warning(f"{len(report)} course counters corrected:")
+                    st.dataframe(report, use_container_width=True, hide_index=True,
+                                 column_config={"name": "Course Name", "registered": "Before", "actual": "Registered Students"})
+
 # Modificar a seção de Admin Dashboard para verificar a autenticação da área administrativa
 elif page == "Admin Dashboard":
     if not st.session_state.authenticated_admin_area:
@@ -392,25 +611,22 @@ elif page == "Admin Dashboard":
         st.title("Administrative Dashboard")
         
         courses_df = load_or_create_courses_db()
-        registrations_df = load_or_create_registrations_db()
         
         # Display courses statistics
         st.header("Courses Overview")
         
-        # Calculate remaining slots
-        courses_df['remaining_slots'] = courses_df['slots'] - courses_df['registered']
+        # Vagas restantes e taxa de ocupação calculadas de forma vetorizada
+        overview_df = courses_overview(courses_df)
         
-        # Display as a formatted table
+        # Display as a formatted table (estilo aplicado em uma única chamada para a tabela inteira)
         st.dataframe(
-            courses_df[['name', 'slots', 'registered', 'remaining_slots', 'status']].style
-            .apply(lambda x: ['background-color: #ff4444; color: white; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             if x['remaining_slots'] == 0 
-                             else 'background-color: #4CAF50; font-weight: bold; border: 1px solid gray; text-align: center' 
-                             for i in x], axis=1)
+            overview_df.style
+            .apply(overview_styles, axis=None)
             .format({
                 'slots': '{:,.0f}',
                 'registered': '{:,.0f}',
-                'remaining_slots': '{:,.0f}'
+                'remaining_slots': '{:,.0f}',
+                'fill_ratio': '{:.0%}'
             })
             .set_properties(**{
                 'text-align': 'center',
@@ -423,20 +639,59 @@ elif page == "Admin Dashboard":
                 "slots": "Total Slots",
                 "registered": "Registered Students",
                 "remaining_slots": "Available Slots",
+                "fill_ratio": "Occupancy",
                 "status": "Status"
             },
             use_container_width=True
         )
         
+        # Inscrições por empresa e por dia (agregados atualizados a cada inscrição)
+        course_aggregates = get_course_aggregates()
+        with st.expander("Inscrições por empresa e por dia"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(course_aggregates.company_table(), hide_index=True, use_container_width=True,
+                             column_config={"course_name": "Curso", "company": "Empresa", "registrations": "Inscrições"})
+            with col2:
+                st.dataframe(course_aggregates.daily_table(), hide_index=True, use_container_width=True,
+                             column_config={"course_name": "Curso", "day": "Dia", "registrations": "Inscrições"})
+        
+        # Relatório de inscrições duplicadas (mesmo CPF ou email no mesmo curso), gerado sob demanda
+        with st.expander("Inscrições duplicadas"):
+            if st.button("Gerar relatório de duplicidades"):
+                duplicates_df = duplicate_report(load_or_create_registrations_db(), course_ids_by_name())
+                if duplicates_df.empty:
+                    st.success("Nenhuma inscrição duplicada encontrada.")
+                else:
+                    st.dataframe(duplicates_df, hide_index=True, use_container_width=True,
+                                 column_config={"course_name": "Curso", "duplicate_on": "Duplicado em"})
+        
+        # Último relatório da verificação de integridade em segundo plano
+        with st.expander("Manutenção de imagens"):
+            integrity_report = integrity_checker.last_report
+            if integrity_report is None:
+                st.info("A primeira verificação ainda está em andamento.")
+            elif 'error' in integrity_report:
+                st.error(f"Falha na verificação de {integrity_report['checked_at']:%d/%m/%Y %H:%M}: {integrity_report['error']}")
+            else:
+                st.write(f"Última verificação: {integrity_report['checked_at']:%d/%m/%Y %H:%M}")
+                st.write(f"Cursos em quarentena: {', '.join(integrity_report['quarantined']) or 'nenhum'}")
+                st.write(f"Arquivos removidos: {len(integrity_report['removed_files'])} "
+                         f"({integrity_report['freed_bytes'] / 1024:.0f} KB liberados)")
+                for error in integrity_report['errors']:
+                    st.warning(error)
+            if st.button("Verificar agora"):
+                integrity_checker.wake()
+        
         # Adicionar seção de detalhes de inscrições
         st.header("Detalhes de Inscrições")
         
-        if registrations_df.empty:
+        # Agrupar cursos para seleção (lendo apenas a coluna course_name)
+        cursos_disponiveis = registered_course_names(REGISTRATIONS_DB)
+        
+        if not cursos_disponiveis:
             st.info("Não há inscrições registradas.")
         else:
-            # Agrupar cursos para seleção
-            cursos_disponiveis = sorted(registrations_df['course_name'].unique())
-            
             # Opção para visualizar todos os cursos ou filtrar por curso específico
             opcao_visualizacao = st.radio(
                 "Visualizar inscrições:",
@@ -444,20 +699,25 @@ elif page == "Admin Dashboard":
                 horizontal=True
             )
             
+            curso_selecionado = None
             if opcao_visualizacao == "Filtrar por curso":
                 curso_selecionado = st.selectbox("Selecione o curso:", cursos_disponiveis)
-                registrations_filtradas = registrations_df[registrations_df['course_name'] == curso_selecionado]
-            else:
-                registrations_filtradas = registrations_df
+            
+            # Filtro opcional por período de inscrição
+            periodo = st.date_input("Período de inscrição (opcional):", value=[], format="DD/MM/YYYY")
+            data_inicio, data_fim = periodo if len(periodo) == 2 else (None, None)
+            
+            # Os filtros são aplicados na leitura do Parquet: só as linhas do curso/período são carregadas
+            registrations_filtradas = query_registrations(
+                REGISTRATIONS_DB,
+                course_name=curso_selecionado,
+                start=data_inicio,
+                end=data_fim
+            ).sort_values('registration_date', ascending=False)
             
             # Exibir tabela de inscrições
             if not registrations_filtradas.empty:
-                # Formatar a data de inscrição
-                registrations_filtradas['registration_date'] = pd.to_datetime(
-                    registrations_filtradas['registration_date']
-                ).dt.strftime('%d/%m/%Y %H:%M')
-                
-                # Exibir tabela formatada
+                # Exibir tabela formatada (a data é formatada pelo próprio componente)
                 st.dataframe(
                     registrations_filtradas,
                     hide_index=True,
@@ -467,29 +727,30 @@ elif page == "Admin Dashboard":
                         "cpf": "CPF",
                         "email": "Email",
                         "company": "Empresa",
-                        "registration_date": "Data de Inscrição"
+                        "registration_date": st.column_config.DatetimeColumn(
+                            "Data de Inscrição", format="DD/MM/YYYY HH:mm"
+                        )
                     },
                     use_container_width=True
                 )
                 
-                # Opção para exportar para Excel
-                if st.button("Exportar para Excel"):
-                    # Criar um buffer para o arquivo Excel
-                    buffer = io.BytesIO()
-                    
-                    # Salvar o DataFrame no buffer
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        registrations_filtradas.to_excel(writer, index=False, sheet_name='Inscrições')
-                    
-                    # Preparar o download
-                    buffer.seek(0)
-                    
-                    # Oferecer o download
-                    st.download_button(
-                        label="Baixar arquivo Excel",
-                        data=buffer,
-                        file_name=f"inscricoes{'_'+curso_selecionado if opcao_visualizacao == 'Filtrar por curso' else ''}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                # Opção para exportar (Excel, CSV ou Parquet)
+                formato_exportacao = st.radio("Formato:", list(EXPORT_FORMATS), horizontal=True)
+                extensao, mime = EXPORT_FORMATS[formato_exportacao]
+                
+                # Exportação em blocos direto do armazenamento, gerada só no clique do download
+                # (nada do arquivo fica em memória no script entre os reruns)
+                st.download_button(
+                    label=f"Exportar para {formato_exportacao}",
+                    data=deferred_export(
+                        REGISTRATIONS_DB,
+                        export_format=formato_exportacao,
+                        course_name=curso_selecionado,
+                        start=data_inicio,
+                        end=data_fim
+                    ),
+                    file_name=f"inscricoes{'_'+curso_selecionado if curso_selecionado else ''}{extensao}",
+                    mime=mime
+                )
             else:
-                st.info(f"Não há inscrições para o curso selecionado.")
\ No newline at end of file
+                st.info(f"Não há inscrições para o filtro selecionado.")
\ No newline at end of file
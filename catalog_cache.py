@@ -0,0 +1,84 @@
+import time
+import threading
+
+
+class CatalogCache:
+    # Cache do catálogo de cursos com invalidação explícita.
+    # A versão é (geração, versão do repositório): qualquer escrita feita por este
+    # processo incrementa a geração e a versão do repositório (ex.: mtime do
+    # arquivo Excel) detecta escritas de outros processos. Backends sem versão
+    # usam um TTL curto.
+    def __init__(self, repository, ttl=5.0):
+        self.repository = repository
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._snapshot = None
+        self._index = {}
+        self._id_index = {}
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+
+    def _current_version(self):
+        return (self.generation, self.repository.catalog_version())
+
+    def _refresh(self):
+        # Deve ser chamado com o lock; recarrega o snapshot e o índice se a versão mudou
+        version = self._current_version()
+        fresh = self._snapshot is not None and version == self._version
+        if fresh and version[1] is None:
+            fresh = time.monotonic() - self._loaded_at < self.ttl
+        if fresh:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._snapshot = self.repository.load_courses()
+        # Índice nome -> posição; com nomes repetidos vale o primeiro, como no .iloc[0]
+        self._index = {}
+        for position, name in enumerate(self._snapshot['name']):
+            self._index.setdefault(name, position)
+        # Índice id -> posição (o id é único)
+        self._id_index = {int(course_id): position for position, course_id in enumerate(self._snapshot['id'])}
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def get(self):
+        with self._lock:
+            self._refresh()
+            # Cada leitor recebe a sua própria cópia: alterações nas páginas
+            # nunca chegam ao snapshot guardado
+            return self._snapshot.copy()
+
+    def _row_at(self, position):
+        # Deve ser chamado com o lock; cópia da linha (Series) ou None
+        if position is None:
+            return None
+        return self._snapshot.iloc[position].copy()
+
+    def get_course(self, name):
+        # Busca O(1) pelo nome
+        with self._lock:
+            self._refresh()
+            return self._row_at(self._index.get(name))
+
+    def get_course_by_id(self, course_id):
+        # Busca O(1) pelo id estável
+        with self._lock:
+            self._refresh()
+            return self._row_at(self._id_index.get(int(course_id)))
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'generation': self.generation,
+            }
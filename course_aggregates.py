@@ -0,0 +1,88 @@
+import threading
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+# Estilos da tabela de visão geral (cursos esgotados em vermelho, demais em verde)
+FULL_STYLE = 'background-color: #ff4444; color: white; font-weight: bold; border: 1px solid gray; text-align: center'
+OPEN_STYLE = 'background-color: #4CAF50; font-weight: bold; border: 1px solid gray; text-align: center'
+
+
+class CourseAggregates:
+    # Contagens por curso/empresa e curso/dia mantidas de forma incremental:
+    # construídas uma vez com group-by e atualizadas a cada inscrição
+    def __init__(self):
+        self.by_company = Counter()
+        self.by_day = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_registrations(cls, registrations_df):
+        aggregates = cls()
+        aggregates.record_registrations(registrations_df)
+        return aggregates
+
+    def _grouped(self, registrations_df):
+        days = pd.to_datetime(registrations_df['registration_date'], errors='coerce').dt.date
+        by_company = registrations_df.groupby(['course_name', 'company'], dropna=False).size()
+        by_day = registrations_df.groupby([registrations_df['course_name'], days], dropna=False).size()
+        return by_company.to_dict(), by_day.to_dict()
+
+    def record_registrations(self, registrations_df):
+        # Várias inscrições de uma vez (ex.: importação de lista) com um group-by
+        if registrations_df.empty:
+            return
+        by_company, by_day = self._grouped(registrations_df)
+        with self._lock:
+            self.by_company.update(by_company)
+            self.by_day.update(by_day)
+
+    def remove_registrations(self, registrations_df):
+        # Inscrições canceladas ou transferidas; contagens zeradas saem das tabelas
+        if registrations_df.empty:
+            return
+        by_company, by_day = self._grouped(registrations_df)
+        with self._lock:
+            self.by_company.subtract(by_company)
+            self.by_day.subtract(by_day)
+            self.by_company = +self.by_company
+            self.by_day = +self.by_day
+
+    def record_registration(self, course_name, company, registration_date, count=1):
+        day = pd.Timestamp(registration_date).date()
+        with self._lock:
+            self.by_company[(course_name, company)] += count
+            self.by_day[(course_name, day)] += count
+
+    def _table(self, counter, column):
+        with self._lock:
+            items = list(counter.items())
+        if not items:
+            return pd.DataFrame(columns=['course_name', column, 'registrations'])
+        keys, counts = zip(*items)
+        df = pd.DataFrame(list(keys), columns=['course_name', column])
+        df['registrations'] = counts
+        return df.sort_values(['course_name', column], ignore_index=True)
+
+    def company_table(self):
+        return self._table(self.by_company, 'company')
+
+    def daily_table(self):
+        return self._table(self.by_day, 'day')
+
+
+def courses_overview(courses_df):
+    # Vagas restantes e taxa de ocupação calculadas em bloco (sem lambdas por linha)
+    overview = courses_df[['name', 'slots', 'registered', 'status']].copy()
+    slots = pd.to_numeric(overview['slots'], errors='coerce').fillna(0).to_numpy()
+    registered = pd.to_numeric(overview['registered'], errors='coerce').fillna(0).to_numpy()
+    overview['remaining_slots'] = slots - registered
+    overview['fill_ratio'] = np.divide(registered, slots, out=np.zeros(len(overview)), where=slots > 0)
+    return overview[['name', 'slots', 'registered', 'remaining_slots', 'fill_ratio', 'status']]
+
+
+def overview_styles(overview):
+    # Uma única chamada para a tabela inteira: Styler.apply(..., axis=None)
+    styles = np.where(overview['remaining_slots'].to_numpy() <= 0, FULL_STYLE, OPEN_STYLE)
+    return pd.DataFrame(np.repeat(styles[:, None], overview.shape[1], axis=1),
+                        index=overview.index, columns=overview.columns)
@@ -0,0 +1,54 @@
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+# Pool padrão; pode ser ajustado em [storage.pool] nos secrets
+POOL_DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+}
+
+
+class MonitoredQueuePool(QueuePool):
+    # QueuePool que conta quantas vezes um checkout encontrou o pool esgotado
+    # (todas as conexões e o overflow em uso) e quanto tempo esperou por isso
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_overflow = kwargs.get('max_overflow', 10)
+        self.waits = 0
+        self.wait_time = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        exhausted = self.max_overflow >= 0 and self.checkedout() >= self.size() + self.max_overflow
+        start = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            if exhausted:
+                with self._stats_lock:
+                    self.waits += 1
+                    self.wait_time += time.monotonic() - start
+
+
+def create_pooled_engine(database_url, **pool_options):
+    options = {**POOL_DEFAULTS, **pool_options}
+    return create_engine(database_url, poolclass=MonitoredQueuePool, **options)
+
+
+def pool_stats(engine):
+    # Conexões em uso, ociosas e em overflow, mais as esperas por pool esgotado
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': getattr(pool, 'max_overflow', None),
+        'waits': getattr(pool, 'waits', 0),
+        'wait_time': getattr(pool, 'wait_time', 0.0),
+    }
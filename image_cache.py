@@ -0,0 +1,114 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+# Limites padrão do cache de miniaturas
+MAX_DISK_BYTES = 100 * 1024 * 1024
+MAX_MEMORY_ENTRIES = 512
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def thumbnail_name(image_path, size):
+    # Nome da miniatura no cache: muda junto com a versão do arquivo de origem
+    stat = os.stat(image_path)
+    raw = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest() + '.png'
+
+
+class ThumbnailCache:
+    # Cache endereçado por conteúdo: chave = caminho de origem + mtime + tamanho
+    def __init__(self, cache_dir, max_disk_bytes=MAX_DISK_BYTES, max_memory_entries=MAX_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, image_path, size):
+        return thumbnail_name(image_path, size)[:-len('.png')]
+
+    def _remember(self, key, path):
+        self._memory[key] = path
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, image_path, size=(400, 300)):
+        key = self._key(image_path, size)
+        with self._lock:
+            path = self._memory.get(key)
+        if path is not None:
+            # Acerto em memória também atualiza o mtime, senão a limpeza de miniaturas
+            # antigas (integrity) apagaria arquivos ainda em uso
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Arquivo apagado por fora: esquecer e gerar de novo
+                with self._lock:
+                    self._memory.pop(key, None)
+            else:
+                with self._lock:
+                    if key in self._memory:
+                        self._memory.move_to_end(key)
+                    self.hits += 1
+                return path
+
+        path = os.path.join(self.cache_dir, key + '.png')
+        if os.path.exists(path):
+            # Atualizar o horário de acesso para a ordem LRU em disco
+            os.utime(path)
+            with self._lock:
+                self._remember(key, path)
+                self.hits += 1
+            return path
+
+        img = Image.open(image_path)
+        img = img.resize(size, Image.LANCZOS)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, format='PNG')
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, path)
+            self.misses += 1
+        self._evict_disk()
+        return path
+
+    def _evict_disk(self):
+        # Remover as miniaturas usadas há mais tempo até caber no limite
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.png'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path, entry.name[:-4]))
+                total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()
+        with self._lock:
+            for _, size, path, key in entries:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._memory.pop(key, None)
+                total -= size
+
+
+def get_thumbnail_cache(cache_dir, **kwargs):
+    # Uma instância por diretório e por processo, reaproveitada entre os reruns
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = ThumbnailCache(cache_dir, **kwargs)
+            _caches[cache_dir] = cache
+        return cache
@@ -0,0 +1,56 @@
+import io
+import os
+from PIL import Image, ImageOps
+
+# Versões geradas no upload: nome -> (largura, altura, qualidade)
+RENDITIONS = {
+    'thumb': (160, 120, 70),
+    'card': (400, 300, 80),
+    'detail': (1200, 900, 85),
+}
+IMAGE_FORMAT = 'WEBP'
+IMAGE_EXTENSION = '.webp'
+
+
+def rendition_filename(base_name, rendition):
+    return f"{base_name}_{rendition}{IMAGE_EXTENSION}"
+
+
+def ingest_image(image_bytes, images_dir, base_name):
+    # Decodificar uma vez, corrigir a orientação e gerar todas as versões sem metadados
+    img = Image.open(io.BytesIO(image_bytes))
+    img = ImageOps.exif_transpose(img)
+    img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+
+    paths = {}
+    for rendition, (width, height, quality) in RENDITIONS.items():
+        if rendition == 'detail':
+            # Versão de detalhe mantém a proporção original
+            resized = img.copy()
+            resized.thumbnail((width, height), Image.LANCZOS)
+        else:
+            # Cards e miniaturas são recortados para o tamanho exato
+            resized = ImageOps.fit(img, (width, height), Image.LANCZOS)
+
+        path = os.path.join(images_dir, rendition_filename(base_name, rendition))
+        tmp_path = path + '.tmp'
+        # Salvar sem repassar exif/icc: a imagem sai sem metadados
+        resized.save(tmp_path, format=IMAGE_FORMAT, quality=quality, method=6)
+        os.replace(tmp_path, path)
+        paths[rendition] = path
+    return paths
+
+
+def save_course_image(image_bytes, images_dir, course_name):
+    # Retorna o caminho da versão 'detail', gravado em image_path no catálogo
+    base_name = course_name.replace(' ', '_')
+    return ingest_image(image_bytes, images_dir, base_name)['detail']
+
+
+def rendition_path(image_path, rendition):
+    # Caminho de outra versão a partir do image_path salvo; None para banners antigos
+    suffix = '_detail' + IMAGE_EXTENSION
+    if not image_path or not image_path.endswith(suffix):
+        return None
+    path = image_path[:-len(suffix)] + f"_{rendition}{IMAGE_EXTENSION}"
+    return path if os.path.exists(path) else None
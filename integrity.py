@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from datetime import datetime
+from image_cache import thumbnail_name
+from image_pipeline import RENDITIONS, rendition_filename
+from static_images import content_hash
+
+# Intervalo entre verificações e idade mínima para um arquivo ser considerado órfão
+# (evita apagar o upload de um curso que ainda está sendo salvo)
+CHECK_INTERVAL = 300.0
+GRACE_PERIOD = 3600.0
+# Miniaturas do cache não usadas há mais tempo que isto são removidas
+THUMBNAIL_MAX_AGE = 30 * 24 * 3600.0
+
+QUARANTINE_STATUS = 'quarantined'
+# Status possíveis de um curso; cursos em quarentena não aparecem na Library
+COURSE_STATUSES = ['open', 'completed', QUARANTINE_STATUS]
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def _normalized(path):
+    # Comparação de caminhos independente de maiúsculas no Windows
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _rendition_siblings(image_path):
+    # Versões geradas junto com um banner salvo pelo image_pipeline
+    name = os.path.basename(image_path)
+    suffix = '_detail.webp'
+    if not name.endswith(suffix):
+        return []
+    base_name = name[:-len(suffix)]
+    directory = os.path.dirname(image_path)
+    return [os.path.join(directory, rendition_filename(base_name, rendition)) for rendition in RENDITIONS]
+
+
+class IntegrityChecker:
+    # Reconcilia o diretório de imagens com o catálogo fora do caminho das requisições:
+    # cursos sem banner vão para quarentena (status 'quarantined', somem da Library),
+    # imagens órfãs, temporários, miniaturas antigas e cópias publicadas de banners
+    # substituídos (static_dir) são removidos
+    def __init__(self, repository, images_dir, protected=(), on_change=None, interval=CHECK_INTERVAL,
+                 grace_period=GRACE_PERIOD, thumbnail_max_age=THUMBNAIL_MAX_AGE, static_dir=None):
+        self.repository = repository
+        self.images_dir = images_dir
+        self.static_dir = static_dir
+        self.protected = {_normalized(path) for path in protected}
+        self.on_change = on_change
+        self.interval = interval
+        self.grace_period = grace_period
+        self.thumbnail_max_age = thumbnail_max_age
+        self.last_report = None
+        # Hash do conteúdo por versão do arquivo (caminho, mtime, tamanho)
+        self._hashes = {}
+        self._wake = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        # Antecipa a próxima verificação (ex.: quando o diretório de imagens mudou)
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_report = {'checked_at': datetime.now(), 'error': str(e)}
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _quarantine_courses(self, courses_df, report):
+        for _, course in courses_df.iterrows():
+            if course['status'] == QUARANTINE_STATUS:
+                continue
+            image_path = course['image_path']
+            if isinstance(image_path, str) and os.path.exists(image_path):
+                continue
+            if self.repository.update_course(course['id'], {'status': QUARANTINE_STATUS}):
+                report['quarantined'].append(course['name'])
+
+    def _referenced_paths(self, courses_df):
+        referenced = set(self.protected)
+        for image_path in courses_df['image_path'].dropna():
+            referenced.add(_normalized(image_path))
+            referenced.update(_normalized(path) for path in _rendition_siblings(image_path))
+        return referenced
+
+    def _remove(self, path, report):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError as e:
+            report['errors'].append(f"{path}: {e}")
+            return
+        report['removed_files'].append(path)
+        report['freed_bytes'] += size
+
+    def _collect_files(self, referenced, report):
+        now = time.time()
+        for entry in os.scandir(self.images_dir):
+            if not entry.is_file():
+                continue
+            age = now - entry.stat().st_mtime
+            if age < self.grace_period:
+                continue
+            name = entry.name
+            # Redimensionamentos temporários antigos e gravações interrompidas
+            if name.startswith('temp_') or name.endswith('.tmp'):
+                self._remove(entry.path, report)
+            elif name.lower().endswith(IMAGE_EXTENSIONS) and _normalized(entry.path) not in referenced:
+                self._remove(entry.path, report)
+
+    def _collect_thumbnails(self, report):
+        thumbnails_dir = os.path.join(self.images_dir, '.thumbnails')
+        if not os.path.isdir(thumbnails_dir):
+            return
+        # O cache de miniaturas atualiza o mtime a cada acerto: mtime antigo = não usado
+        cutoff = time.time() - self.thumbnail_max_age
+        for entry in os.scandir(thumbnails_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                self._remove(entry.path, report)
+
+    def _content_hash(self, path, immutable=False):
+        # Miniaturas têm a versão no nome: o mtime (atualizado a cada acerto) fica de fora
+        stat = os.stat(path)
+        key = (path,) if immutable else (path, stat.st_mtime_ns, stat.st_size)
+        digest = self._hashes.get(key)
+        if digest is None:
+            digest = content_hash(path)
+            self._hashes[key] = digest
+        return digest
+
+    def _current_thumbnails(self, courses_df):
+        # Miniaturas que o cache serve hoje para os banners do catálogo (banners antigos)
+        thumbnails_dir = os.path.join(self.images_dir, '.thumbnails')
+        paths = set()
+        for image_path in courses_df['image_path'].dropna():
+            for width, height, _ in RENDITIONS.values():
+                try:
+                    path = os.path.join(thumbnails_dir, thumbnail_name(image_path, (width, height)))
+                except OSError:
+                    break
+                if os.path.exists(path):
+                    paths.add(path)
+        return paths
+
+    def _collect_published(self, referenced, courses_df, report):
+        if self.static_dir is None or not os.path.isdir(self.static_dir):
+            return
+        # As cópias publicadas têm o hash do conteúdo no nome: as que não correspondem a
+        # nenhuma imagem referenciada (ou miniatura dela) vêm de banners substituídos
+        thumbnails = self._current_thumbnails(courses_df)
+        current = set()
+        for path in referenced | thumbnails:
+            try:
+                current.add(self._content_hash(path, immutable=path in thumbnails))
+            except OSError:
+                continue
+        self._hashes = {key: digest for key, digest in self._hashes.items()
+                        if key[0] in referenced or key[0] in thumbnails}
+        now = time.time()
+        for entry in os.scandir(self.static_dir):
+            if not entry.is_file() or now - entry.stat().st_mtime < self.grace_period:
+                continue
+            if entry.name.endswith('.tmp') or entry.name.split('.')[0] not in current:
+                self._remove(entry.path, report)
+
+    def run_once(self):
+        with self._run_lock:
+            report = {
+                'checked_at': datetime.now(),
+                'quarantined': [],
+                'removed_files': [],
+                'freed_bytes': 0,
+                'errors': [],
+            }
+            courses_df = self.repository.load_courses()
+            self._quarantine_courses(courses_df, report)
+            # Catálogo vazio (ou ilegível) nunca deve fazer todas as imagens parecerem órfãs
+            if os.path.isdir(self.images_dir) and not courses_df.empty:
+                referenced = self._referenced_paths(courses_df)
+                self._collect_files(referenced, report)
+                self._collect_thumbnails(report)
+                self._collect_published(referenced, courses_df, report)
+            if report['quarantined'] and self.on_change:
+                self.on_change()
+            self.last_report = report
+            return report
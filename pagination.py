@@ -0,0 +1,20 @@
+import math
+
+# Cursos por página na Library (grade de 3 colunas: múltiplos de 3)
+PAGE_SIZE = 12
+PAGE_SIZE_OPTIONS = [6, 12, 24, 48]
+
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+def clamp_page(page, total, page_size):
+    # Página válida mesmo depois de o catálogo encolher ou o tamanho da página mudar
+    return min(max(int(page), 1), page_count(total, page_size))
+
+
+def page_rows(df, page, page_size):
+    # Só as linhas da página visível: imagens e widgets são gerados apenas para elas
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -0,0 +1,90 @@
+import csv
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from registration_log import REGISTRATION_COLUMNS, iter_registration_chunks
+
+# Formatos de exportação: extensão e tipo MIME
+EXPORT_FORMATS = {
+    'Excel': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'CSV': ('.csv', 'text/csv'),
+    'Parquet': ('.parquet', 'application/octet-stream'),
+}
+CHUNK_SIZE = 5000
+
+
+def _python_value(value):
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _write_xlsx(chunks, path):
+    # Modo write-only do openpyxl: as linhas vão direto para o arquivo
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Inscrições')
+    sheet.append(REGISTRATION_COLUMNS)
+    for chunk in chunks:
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([_python_value(value) for value in row])
+    workbook.save(path)
+
+
+def _write_csv(chunks, path):
+    # utf-8-sig para o Excel reconhecer os acentos ao abrir o CSV
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(REGISTRATION_COLUMNS)
+        for chunk in chunks:
+            # Valores ausentes (NaN/NA) saem como célula vazia
+            writer.writerows(chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None))
+
+
+def _write_parquet(chunks, path):
+    types = {'course_id': pa.int64(), 'registration_date': pa.timestamp('us')}
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in REGISTRATION_COLUMNS])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+_WRITERS = {'Excel': _write_xlsx, 'CSV': _write_csv, 'Parquet': _write_parquet}
+
+
+def export_registrations(snapshot_path, export_format='Excel', course_name=None, start=None, end=None,
+                         chunk_size=CHUNK_SIZE):
+    # Grava a exportação em um arquivo temporário, bloco a bloco, e retorna o caminho.
+    # O chamador é responsável por remover o arquivo depois do download.
+    extension, _ = EXPORT_FORMATS[export_format]
+    fd, path = tempfile.mkstemp(prefix='inscricoes_', suffix=extension)
+    os.close(fd)
+    chunks = iter_registration_chunks(snapshot_path, course_name=course_name, start=start, end=end,
+                                      chunk_size=chunk_size)
+    try:
+        _WRITERS[export_format](chunks, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def deferred_export(snapshot_path, export_format='Excel', course_name=None, start=None, end=None):
+    # Para st.download_button(data=...): a exportação só é gerada no clique, numa thread
+    # separada do rerun, e o arquivo temporário é removido logo depois de lido. O Streamlit
+    # guarda o conteúdo para servir o download (não envia em streaming): fica só essa cópia
+    def generate():
+        path = export_registrations(snapshot_path, export_format, course_name=course_name,
+                                    start=start, end=end)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+    return generate
@@ -0,0 +1,103 @@
+import threading
+import numpy as np
+import pandas as pd
+from validators import normalize_cpf, normalize_cpfs, normalize_email, normalize_emails
+
+
+def cpf_key(cpf):
+    # Apenas os dígitos: "123.456.789-09" e "12345678909" são o mesmo CPF
+    return normalize_cpf(cpf)
+
+
+def email_key(email):
+    # "Ana@Empresa.com " e "ana@empresa.com" são o mesmo email
+    return normalize_email(email)
+
+
+# Versões vetorizadas para construir os índices e o relatório
+def cpf_keys(cpfs):
+    return normalize_cpfs(cpfs.astype(str))
+
+
+def email_keys(emails):
+    return normalize_emails(emails.astype(str))
+
+
+def course_keys(registrations_df, course_ids=None):
+    # Chave do curso por inscrição: o course_id; inscrições antigas sem id usam o id
+    # atual do curso com o mesmo nome (course_ids: nome -> id) ou, sem ele, o nome
+    names = registrations_df['course_name']
+    ids = pd.to_numeric(registrations_df['course_id'], errors='coerce')
+    ids = ids.fillna(pd.to_numeric(names.map(course_ids or {}), errors='coerce'))
+    keys = ids.astype('Int64').astype(object)
+    keys[ids.isna()] = names[ids.isna()]
+    return keys
+
+
+class RegistrationIndex:
+    # Índices secundários (curso, cpf) e (curso, email) em memória: verificação de
+    # inscrição duplicada em O(1) no envio do formulário
+    def __init__(self):
+        self._by_cpf = set()
+        self._by_email = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_registrations(cls, registrations_df, course_ids=None):
+        index = cls()
+        if registrations_df.empty:
+            return index
+        keys = course_keys(registrations_df, course_ids)
+        index._by_cpf.update(zip(keys, cpf_keys(registrations_df['cpf'])))
+        index._by_email.update(zip(keys, email_keys(registrations_df['email'])))
+        return index
+
+    def find(self, course_id, cpf, email):
+        # Campo já inscrito no curso ('cpf' ou 'email') ou None, sem registrar nada
+        with self._lock:
+            if (int(course_id), cpf_key(cpf)) in self._by_cpf:
+                return 'cpf'
+            if (int(course_id), email_key(email)) in self._by_email:
+                return 'email'
+        return None
+
+    def claim(self, course_id, cpf, email):
+        # Verifica e registra na mesma operação; retorna o campo duplicado ou None
+        by_cpf = (int(course_id), cpf_key(cpf))
+        by_email = (int(course_id), email_key(email))
+        with self._lock:
+            if by_cpf in self._by_cpf:
+                return 'cpf'
+            if by_email in self._by_email:
+                return 'email'
+            self._by_cpf.add(by_cpf)
+            self._by_email.add(by_email)
+        return None
+
+    def release(self, course_id, cpf, email):
+        # Desfaz um claim cuja inscrição não foi gravada (ex.: curso esgotado)
+        with self._lock:
+            self._by_cpf.discard((int(course_id), cpf_key(cpf)))
+            self._by_email.discard((int(course_id), email_key(email)))
+
+
+def duplicate_report(registrations_df, course_ids=None):
+    # Relatório de inscrições repetidas no mesmo curso por CPF ou email.
+    # duplicated() usa hash, então o custo é linear no número de inscrições.
+    if registrations_df.empty:
+        return registrations_df.assign(duplicate_on=pd.Series(dtype=object))
+    keys = pd.DataFrame({
+        'course': course_keys(registrations_df, course_ids),
+        'cpf': cpf_keys(registrations_df['cpf']),
+        'email': email_keys(registrations_df['email']),
+    }, index=registrations_df.index)
+    by_cpf = keys.duplicated(['course', 'cpf'], keep=False)
+    by_email = keys.duplicated(['course', 'email'], keep=False)
+    duplicated = by_cpf | by_email
+    report = registrations_df[duplicated].copy()
+    report['duplicate_on'] = np.select([by_cpf[duplicated] & by_email[duplicated], by_cpf[duplicated]],
+                                       ['cpf, email', 'cpf'], default='email')
+    # Só as linhas duplicadas: num frame vazio o assign adotaria o índice de keys inteiro
+    rows = keys.loc[duplicated]
+    order = rows.assign(course=rows['course'].astype(str)).sort_values(['course', 'cpf']).index
+    return report.loc[order]
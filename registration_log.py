@@ -0,0 +1,417 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+from locks import file_lock
+from registration_index import course_keys
+
+# Colunas padrão da planilha de inscrições: course_id referencia o id estável do curso;
+# course_name fica como rótulo para exibição/exportação e para inscrições antigas sem id
+REGISTRATION_COLUMNS = ['course_id', 'course_name', 'name', 'cpf', 'email', 'company', 'registration_date']
+
+# Quantidade de linhas pendentes no log antes de disparar a compactação
+COMPACT_THRESHOLD = 200
+
+# Tamanho dos row groups do Parquet: com o arquivo ordenado por curso, as
+# estatísticas de cada grupo permitem pular os grupos de outros cursos
+ROW_GROUP_SIZE = 8192
+
+# Protege a troca snapshot/segmento contra leituras simultâneas dentro do processo;
+# _locked soma a ele o lock de arquivo, que vale também entre processos
+_lock = threading.RLock()
+_pending = {}
+_compacting = set()
+
+
+def log_path_for(snapshot_path):
+    return os.path.splitext(snapshot_path)[0] + '.log.jsonl'
+
+
+def _segment_path_for(snapshot_path):
+    return log_path_for(snapshot_path) + '.compacting'
+
+
+@contextmanager
+def _locked(snapshot_path):
+    # Sempre o lock do processo antes do lock de arquivo, para não inverter a ordem
+    with _lock, file_lock(log_path_for(snapshot_path) + '.lock'):
+        yield
+
+
+def _fsync_directory(path):
+    # Torna a troca de nomes (os.replace) durável antes de apagar o segmento
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_snapshot(snapshot_path):
+    if not os.path.exists(snapshot_path):
+        return pd.DataFrame(columns=REGISTRATION_COLUMNS)
+    if snapshot_path.endswith('.parquet'):
+        return _with_columns(pd.read_parquet(snapshot_path))
+    # CPF como texto para não perder zeros à esquerda
+    return _with_columns(pd.read_excel(snapshot_path, dtype={'cpf': str}))
+
+
+def _with_columns(df):
+    # Snapshots antigos não têm course_id: a coluna entra vazia
+    return df.reindex(columns=REGISTRATION_COLUMNS)
+
+
+def typed_registrations(df):
+    # Tipos fixos para o formato colunar: texto como string, data como datetime
+    df = _with_columns(df)
+    for column in REGISTRATION_COLUMNS:
+        if column == 'course_id':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+        elif column == 'registration_date':
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        else:
+            df[column] = df[column].astype('string')
+    return df
+
+
+def _write_snapshot(df, snapshot_path):
+    # Escrever em arquivo temporário e trocar de forma atômica
+    base, ext = os.path.splitext(snapshot_path)
+    tmp_path = f"{base}.tmp{ext}"
+    if ext == '.parquet':
+        df = typed_registrations(df).sort_values(['course_id', 'course_name', 'registration_date'], kind='stable')
+        df.to_parquet(tmp_path, index=False, row_group_size=ROW_GROUP_SIZE)
+    else:
+        df.to_excel(tmp_path, index=False)
+    # O conteúdo precisa estar em disco antes da troca: depois dela o segmento é apagado
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, snapshot_path)
+    _fsync_directory(snapshot_path)
+
+
+def _read_log(path):
+    rows = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # Linha incompleta (escrita interrompida) - ignorar
+                    continue
+    return rows
+
+
+def _split_log(rows):
+    # Separa as inscrições das linhas de cancelamento. Cada linha guarda a sua posição
+    # no log: um cancelamento só remove inscrições gravadas antes dele, então a pessoa
+    # pode se inscrever de novo no mesmo curso depois de cancelar
+    registrations, positions, cancellations = [], [], []
+    for position, row in enumerate(rows, start=1):
+        if 'cancelled_at' in row:
+            cancellations.append({**row, 'position': position})
+        else:
+            registrations.append(row)
+            positions.append(position)
+    pending = pd.DataFrame(registrations, columns=REGISTRATION_COLUMNS)
+    return pending, np.array(positions, dtype='int64'), cancellations
+
+
+def _without_cancelled(df, cancellations, positions=0):
+    # Remove as inscrições canceladas com um único merge. positions é a posição de cada
+    # linha no log (0 para o snapshot, anterior a todo o log); a inscrição casa com o
+    # cancelamento pelo course_id ou, em inscrições antigas sem id, pelo nome do curso
+    if not cancellations or df.empty:
+        return df
+    cancelled = pd.DataFrame(cancellations)
+    course_ids = pd.to_numeric(cancelled['course_id'], errors='coerce').astype('Int64').astype(object)
+    latest = pd.concat([
+        cancelled[['cpf', 'email', 'position']].assign(course=course_ids),
+        cancelled[['cpf', 'email', 'position']].assign(course=cancelled['course_name']),
+    ]).groupby(['course', 'cpf', 'email'], as_index=False, sort=False)['position'].max()
+    # O cancelamento guarda CPF e email exatamente como gravados na inscrição: um isin
+    # sobre o CPF separa as poucas linhas candidatas antes de montar as chaves
+    candidates = np.flatnonzero(df['cpf'].isin(cancelled['cpf']).to_numpy())
+    if not len(candidates):
+        return df
+    rows = df.iloc[candidates]
+    keys = pd.DataFrame({
+        'course': course_keys(rows).to_numpy(),
+        'cpf': rows['cpf'].to_numpy(dtype=object),
+        'email': rows['email'].to_numpy(dtype=object),
+    })
+    cancelled_at = keys.merge(latest, on=['course', 'cpf', 'email'], how='left')['position'].to_numpy()
+    keep = np.ones(len(df), dtype=bool)
+    keep[candidates] = ~(cancelled_at > np.broadcast_to(positions, len(df))[candidates])
+    return df[keep]
+
+
+def cancellation(course_id, course_name, cpf, email, cancelled_at=None):
+    # Linha de cancelamento para o log: remove as inscrições do curso com este CPF e
+    # email (os valores gravados na inscrição, sem normalizar)
+    return {
+        'cancelled_at': cancelled_at or datetime.now(),
+        'course_id': int(course_id),
+        'course_name': course_name,
+        'cpf': cpf,
+        'email': email,
+    }
+
+
+def _count_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def append_registration(snapshot_path, registration):
+    # Acrescentar uma linha ao log - O(1), sem reescrever a planilha
+    append_registrations(snapshot_path, [registration])
+
+
+def append_registrations(snapshot_path, registrations):
+    # Várias inscrições (e cancelamentos) numa única escrita e um único fsync no log
+    if not registrations:
+        return
+    log_path = log_path_for(snapshot_path)
+    lines = ''.join(json.dumps(registration, default=str, ensure_ascii=False) + '\n'
+                    for registration in registrations)
+    with _locked(snapshot_path):
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if snapshot_path not in _pending:
+            _pending[snapshot_path] = _count_lines(log_path)
+        else:
+            _pending[snapshot_path] += len(registrations)
+        should_compact = _pending[snapshot_path] >= COMPACT_THRESHOLD
+    if should_compact:
+        compact_in_background(snapshot_path)
+
+
+def load_registrations(snapshot_path):
+    # Snapshot + segmento em compactação + log, nesta ordem
+    with _locked(snapshot_path):
+        snapshot = _read_snapshot(snapshot_path)
+        rows = _read_log(_segment_path_for(snapshot_path)) + _read_log(log_path_for(snapshot_path))
+    pending, positions, cancellations = _split_log(rows)
+    frames = [_without_cancelled(snapshot, cancellations), _without_cancelled(pending, cancellations, positions)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=REGISTRATION_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce')
+    return df
+
+
+def compact(snapshot_path):
+    # Incorporar o log ao snapshot (Excel ou Parquet). Um processo compacta por vez
+    # (lock .compact); leituras e escritas no log só esperam a troca de arquivos
+    with file_lock(log_path_for(snapshot_path) + '.compact.lock', timeout=600.0):
+        return _compact(snapshot_path)
+
+
+def _compact(snapshot_path):
+    log_path = log_path_for(snapshot_path)
+    segment_path = _segment_path_for(snapshot_path)
+    with _locked(snapshot_path):
+        # Um segmento antigo pode ter sobrado de uma compactação interrompida
+        if not os.path.exists(segment_path):
+            if not os.path.exists(log_path):
+                return 0
+            os.replace(log_path, segment_path)
+            _pending[snapshot_path] = 0
+        rows = _read_log(segment_path)
+
+    # Só o processo com o lock .compact grava o snapshot: lê-lo fora do lock é seguro
+    snapshot = _read_snapshot(snapshot_path)
+    # Os cancelamentos do segmento removem as linhas de vez; os que ainda estão no log
+    # continuam valendo sobre o novo snapshot
+    new_rows, positions, cancellations = _split_log(rows)
+    df = _without_cancelled(snapshot, cancellations)
+    new_rows = _without_cancelled(new_rows, cancellations, positions)
+    if not new_rows.empty:
+        new_rows['registration_date'] = pd.to_datetime(new_rows['registration_date'], errors='coerce')
+        df = pd.concat([df, new_rows], ignore_index=True) if not df.empty else new_rows
+
+    with _locked(snapshot_path):
+        _write_snapshot(df, snapshot_path)
+        os.remove(segment_path)
+    return len(rows)
+
+
+def _compact_worker(snapshot_path):
+    try:
+        compact(snapshot_path)
+    finally:
+        with _lock:
+            _compacting.discard(snapshot_path)
+
+
+def compact_in_background(snapshot_path):
+    with _lock:
+        if snapshot_path in _compacting:
+            return False
+        _compacting.add(snapshot_path)
+    threading.Thread(target=_compact_worker, args=(snapshot_path,), daemon=True).start()
+    return True
+
+
+def _parquet_dataset(snapshot_path):
+    # Leitura via memory map: só as páginas dos row groups selecionados são tocadas
+    return ds.dataset(snapshot_path, format='parquet', filesystem=LocalFileSystem(use_mmap=True))
+
+
+def _date_bounds(start, end):
+    start = datetime.combine(start, datetime.min.time()) if start is not None else None
+    end = datetime.combine(end, datetime.min.time()) + timedelta(days=1) if end is not None else None
+    return start, end
+
+
+def _filter_frame(df, course_name, start, end):
+    mask = pd.Series(True, index=df.index)
+    if course_name is not None:
+        mask &= df['course_name'] == course_name
+    if start is not None:
+        mask &= df['registration_date'] >= start
+    if end is not None:
+        mask &= df['registration_date'] < end
+    return df[mask]
+
+
+def query_registrations(snapshot_path, course_name=None, start=None, end=None):
+    # Inscrições filtradas por curso e período (datas inclusivas).
+    # Com snapshot Parquet o filtro é empurrado para a leitura (predicate pushdown).
+    start, end = _date_bounds(start, end)
+    with _locked(snapshot_path):
+        if snapshot_path.endswith('.parquet') and os.path.exists(snapshot_path):
+            expression = None
+            conditions = []
+            if course_name is not None:
+                conditions.append(ds.field('course_name') == course_name)
+            if start is not None:
+                conditions.append(ds.field('registration_date') >= start)
+            if end is not None:
+                conditions.append(ds.field('registration_date') < end)
+            for condition in conditions:
+                expression = condition if expression is None else expression & condition
+            snapshot = _with_columns(_parquet_dataset(snapshot_path).to_table(filter=expression).to_pandas())
+        else:
+            snapshot = _read_snapshot(snapshot_path)
+            if not snapshot.empty:
+                snapshot['registration_date'] = pd.to_datetime(snapshot['registration_date'], errors='coerce')
+                snapshot = _filter_frame(snapshot, course_name, start, end)
+        rows = _read_log(_segment_path_for(snapshot_path)) + _read_log(log_path_for(snapshot_path))
+
+    pending, positions, cancellations = _split_log(rows)
+    snapshot = _without_cancelled(snapshot, cancellations)
+    frames = [snapshot] if not snapshot.empty else []
+    if not pending.empty:
+        pending['registration_date'] = pd.to_datetime(pending['registration_date'], errors='coerce')
+        pending = _without_cancelled(pending, cancellations, positions)
+        pending = _filter_frame(pending, course_name, start, end)
+        if not pending.empty:
+            frames.append(pending)
+    if not frames:
+        return pd.DataFrame(columns=REGISTRATION_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _row_group_matches(metadata, index, course_name, start, end):
+    # Usa as estatísticas min/max do row group para pular grupos sem linhas do filtro
+    row_group = metadata.row_group(index)
+    names = metadata.schema.names
+    checks = []
+    if course_name is not None:
+        checks.append(('course_name', course_name, course_name))
+    if start is not None or end is not None:
+        checks.append(('registration_date', start, end))
+    for column, low, high in checks:
+        stats = row_group.column(names.index(column)).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        if column == 'course_name':
+            if not (stats.min <= low <= stats.max):
+                return False
+        else:
+            if low is not None and stats.max < low:
+                return False
+            if high is not None and stats.min >= high:
+                return False
+    return True
+
+
+def _slices(df, chunk_size):
+    for offset in range(0, len(df), chunk_size):
+        yield df.iloc[offset:offset + chunk_size]
+
+
+def iter_registration_chunks(snapshot_path, course_name=None, start=None, end=None, chunk_size=5000):
+    # Gera as inscrições filtradas em blocos, sem montar o resultado inteiro em memória.
+    # O Parquet é aberto via memory map sob o lock (do processo e de arquivo), então uma
+    # compactação concorrente, mesmo em outro processo, não altera o arquivo lido.
+    start, end = _date_bounds(start, end)
+    parquet_file = None
+    snapshot = None
+    with _locked(snapshot_path):
+        if snapshot_path.endswith('.parquet') and os.path.exists(snapshot_path):
+            parquet_file = pq.ParquetFile(pa.memory_map(snapshot_path))
+        else:
+            snapshot = _read_snapshot(snapshot_path)
+        rows = _read_log(_segment_path_for(snapshot_path)) + _read_log(log_path_for(snapshot_path))
+
+    pending, positions, cancellations = _split_log(rows)
+    if parquet_file is not None:
+        for index in range(parquet_file.num_row_groups):
+            if not _row_group_matches(parquet_file.metadata, index, course_name, start, end):
+                continue
+            df = _with_columns(parquet_file.read_row_group(index).to_pandas())
+            df = _without_cancelled(_filter_frame(df, course_name, start, end), cancellations)
+            yield from _slices(df, chunk_size)
+    elif not snapshot.empty:
+        snapshot['registration_date'] = pd.to_datetime(snapshot['registration_date'], errors='coerce')
+        snapshot = _without_cancelled(snapshot[REGISTRATION_COLUMNS], cancellations)
+        yield from _slices(_filter_frame(snapshot, course_name, start, end), chunk_size)
+
+    if not pending.empty:
+        pending['registration_date'] = pd.to_datetime(pending['registration_date'], errors='coerce')
+        pending = _without_cancelled(pending, cancellations, positions)
+        yield from _slices(_filter_frame(pending, course_name, start, end), chunk_size)
+
+
+def registered_course_names(snapshot_path):
+    # Nomes de cursos com inscrições, lendo apenas a coluna course_name
+    with _locked(snapshot_path):
+        if snapshot_path.endswith('.parquet') and os.path.exists(snapshot_path):
+            names = set(_parquet_dataset(snapshot_path).to_table(columns=['course_name'])
+                        .column('course_name').unique().to_pylist())
+        else:
+            names = set(_read_snapshot(snapshot_path)['course_name'])
+        rows = _read_log(_segment_path_for(snapshot_path)) + _read_log(log_path_for(snapshot_path))
+    names.update(row.get('course_name') for row in rows if 'cancelled_at' not in row)
+    return sorted(name for name in names if isinstance(name, str))
+
+
+def convert_snapshot_to_parquet(snapshot_path):
+    # Converte um snapshot Excel para Parquet uma única vez; retorna o caminho Parquet
+    parquet_path = os.path.splitext(snapshot_path)[0] + '.parquet'
+    if snapshot_path.endswith('.parquet') or os.path.exists(parquet_path):
+        return parquet_path
+    compact(snapshot_path)
+    _write_snapshot(_read_snapshot(snapshot_path), parquet_path)
+    return parquet_path
@@ -0,0 +1,103 @@
+import io
+from datetime import datetime
+import pandas as pd
+from registration_index import course_keys, cpf_keys, email_keys
+from registration_log import REGISTRATION_COLUMNS
+from validators import normalize_cpfs, normalize_emails, valid_cpfs, valid_emails
+
+ROSTER_COLUMNS = ['name', 'cpf', 'email', 'company']
+# Cabeçalhos aceitos na lista enviada pelas empresas (sem diferenciar maiúsculas)
+COLUMN_ALIASES = {
+    'nome': 'name',
+    'nome completo': 'name',
+    'e-mail': 'email',
+    'empresa': 'company',
+}
+ERROR_COLUMNS = ['row', 'name', 'cpf', 'email', 'error']
+
+
+def read_roster(data, filename):
+    # CSV (separador detectado: vírgula ou ponto e vírgula) ou XLSX, tudo como texto
+    # para não perder zeros à esquerda do CPF
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(io.BytesIO(data), dtype=str, sep=None, engine='python', encoding='utf-8-sig')
+    else:
+        df = pd.read_excel(io.BytesIO(data), dtype=str)
+    df.columns = [COLUMN_ALIASES.get(str(column).strip().lower(), str(column).strip().lower())
+                  for column in df.columns]
+    missing = [column for column in ROSTER_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes na lista: {', '.join(missing)}")
+    df = df[ROSTER_COLUMNS].fillna('').apply(lambda column: column.str.strip())
+    # Índice = número da linha na planilha (linha 1 é o cabeçalho)
+    df.index = pd.RangeIndex(2, len(df) + 2)
+    return df
+
+
+def validate_roster(roster, registrations_df, course_id, course_ids=None):
+    # Cada regra é uma máscara sobre a lista inteira; as mensagens de uma linha são
+    # concatenadas. Retorna (linhas válidas, relatório de erros por linha).
+    cpfs = cpf_keys(roster['cpf'])
+    emails = email_keys(roster['email'])
+    if registrations_df.empty:
+        enrolled = pd.DataFrame(columns=['cpf', 'email'])
+    else:
+        enrolled = registrations_df[course_keys(registrations_df, course_ids) == int(course_id)]
+    checks = [
+        (roster[ROSTER_COLUMNS].eq('').any(axis=1), 'campos em branco'),
+        (~valid_cpfs(roster['cpf']), 'CPF inválido'),
+        (~valid_emails(roster['email']), 'email inválido'),
+        (cpfs.duplicated(), 'CPF repetido na lista'),
+        (emails.duplicated(), 'email repetido na lista'),
+        (cpfs.isin(cpf_keys(enrolled['cpf'])), 'CPF já inscrito no curso'),
+        (emails.isin(email_keys(enrolled['email'])), 'email já inscrito no curso'),
+    ]
+    messages = pd.Series('', index=roster.index)
+    for mask, message in checks:
+        messages = messages.where(~mask, messages + message + '; ')
+    invalid = messages != ''
+    errors = roster.loc[invalid, ['name', 'cpf', 'email']].assign(error=messages[invalid].str.rstrip('; '))
+    return roster[~invalid], errors.rename_axis('row').reset_index()[ERROR_COLUMNS]
+
+
+def import_roster(repository, course, roster, course_ids=None, registration_index=None, registered_at=None):
+    # Valida a lista e, numa única operação do repositório (uma transação no SQL), reserva
+    # as vagas de todas as linhas válidas e grava as inscrições. Retorna (inscrições
+    # gravadas, erros). ValueError quando não há vagas para todas as linhas válidas;
+    # nesse caso, ou se a gravação falhar, nada fica gravado nem reservado.
+    course_id = int(course['id'])
+    valid, errors = validate_roster(roster, repository.load_registrations(), course_id, course_ids)
+
+    if registration_index is not None:
+        # Mantém o índice de duplicidade do formulário em dia; uma inscrição feita pelo
+        # formulário depois da leitura acima também é detectada aqui
+        claimed = [registration_index.claim(course_id, cpf, email) is None
+                   for cpf, email in zip(valid['cpf'], valid['email'])]
+        raced = valid[[not ok for ok in claimed]]
+        valid = valid[claimed]
+        if not raced.empty:
+            late = raced[['name', 'cpf', 'email']].assign(error='já inscrito no curso')
+            errors = pd.concat([errors, late.rename_axis('row').reset_index()], ignore_index=True)
+
+    # CPF gravado só com os dígitos (a lista pode vir com "529.982.247-25")
+    registrations = valid.assign(
+        cpf=normalize_cpfs(valid['cpf']),
+        email=normalize_emails(valid['email']),
+        course_id=course_id,
+        course_name=course['name'],
+        registration_date=registered_at or datetime.now(),
+    )[REGISTRATION_COLUMNS]
+    if registrations.empty:
+        return registrations, errors
+
+    enrolled = False
+    try:
+        enrolled = repository.enroll(course_id, registrations.to_dict('records'))
+    finally:
+        if not enrolled and registration_index is not None:
+            for cpf, email in zip(registrations['cpf'], registrations['email']):
+                registration_index.release(course_id, cpf, email)
+    if not enrolled:
+        raise ValueError(f"Vagas insuficientes: {int(course['slots'] - course['registered'])} disponíveis "
+                         f"para {len(registrations)} inscrições válidas. Nenhuma inscrição foi gravada.")
+    return registrations, errors
@@ -0,0 +1,88 @@
+import os
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from registration_log import REGISTRATION_COLUMNS, load_registrations
+from storage import COURSE_COLUMNS, Course, ExcelRepository, ParquetRepository, Registration, SQLRepository
+from validators import normalize_cpfs, normalize_emails
+
+BATCH_SIZE = 1000
+
+# INSERT ... ON CONFLICT DO NOTHING de cada dialeto suportado
+_DIALECT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _insert_ignoring_conflicts(engine, table):
+    try:
+        insert = _DIALECT_INSERTS[engine.dialect.name]
+    except KeyError:
+        raise ValueError(f"Banco não suportado para migração: {engine.dialect.name}")
+    return insert(table).on_conflict_do_nothing()
+
+
+def _records(df):
+    # NaN/NaT -> None e Timestamp -> datetime, como o driver espera
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    for record in records:
+        for column, value in record.items():
+            if isinstance(value, pd.Timestamp):
+                record[column] = value.to_pydatetime()
+    return records
+
+
+def _batches(df, batch_size):
+    for offset in range(0, len(df), batch_size):
+        yield offset, df.iloc[offset:offset + batch_size]
+
+
+def _insert_in_batches(engine, table, df, batch_size, progress):
+    # Um executemany por lote; cada lote é uma transação, então uma migração
+    # interrompida pode ser executada de novo: o que já foi gravado é ignorado
+    statement = _insert_ignoring_conflicts(engine, table)
+    inserted = 0
+    for offset, batch in _batches(df, batch_size):
+        with engine.begin() as conn:
+            result = conn.execute(statement, _records(batch))
+        inserted += max(result.rowcount, 0)
+        if progress:
+            progress(table.name, offset + len(batch), len(df))
+    return inserted
+
+
+def _source_repository(courses_path, registrations_path):
+    if courses_path.endswith('.parquet'):
+        return ParquetRepository(courses_path, registrations_path)
+    return ExcelRepository(courses_path, registrations_path)
+
+
+def migrate_to_sql(engine, courses_path, registrations_path, batch_size=BATCH_SIZE, progress=None):
+    # Migra cursos e inscrições (Excel ou Parquet, incluindo o log pendente) para o banco.
+    # progress(tabela, linhas_processadas, total) é chamado a cada lote.
+    # Cria as tabelas e acrescenta course_id em bancos antigos
+    SQLRepository(engine)
+    # Bancos criados antes do índice único das inscrições: criar agora (a chave única
+    # é o que torna a migração reexecutável sem duplicar linhas)
+    for index in Registration.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+    summary = {'courses': 0, 'registrations': 0}
+    if os.path.exists(courses_path):
+        courses = _source_repository(courses_path, registrations_path).load_courses()
+        # Os ids são gerados pelo banco; o nome (único) identifica o curso entre as bases
+        columns = [column for column in COURSE_COLUMNS if column != 'id']
+        summary['courses'] = _insert_in_batches(engine, Course.__table__, courses[columns], batch_size, progress)
+
+    registrations = load_registrations(registrations_path)
+    if not registrations.empty:
+        with engine.connect() as conn:
+            course_ids = dict(conn.execute(select(Course.name, Course.id)).all())
+        # course_id passa a apontar para o id do curso no banco; CPF (só dígitos, cabe em
+        # String(11) mesmo quando a planilha tem "529.982.247-25") e email normalizados
+        registrations = registrations[REGISTRATION_COLUMNS].assign(
+            course_id=registrations['course_name'].map(course_ids).astype('Int64'),
+            cpf=normalize_cpfs(registrations['cpf']),
+            email=normalize_emails(registrations['email']))
+        summary['registrations'] = _insert_in_batches(engine, Registration.__table__, registrations,
+                                                      batch_size, progress)
+    return summary
+
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+from PIL import Image
+
+# Mesmo sem mudanças detectadas, revarrer de tempos em tempos (backends sem versão do catálogo)
+MAX_SCAN_AGE = 300.0
+
+
+def ensure_default_image(path, size=(400, 300)):
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        Image.new('RGB', size, color='gray').save(path)
+
+
+class ImageDirectoryWatch:
+    # Verificação barata de consistência antes de varrer os image_path do catálogo:
+    # o mtime do diretório de imagens muda quando arquivos são criados, removidos ou
+    # renomeados, e a versão do catálogo muda quando cursos são gravados
+    def __init__(self, images_dir, max_age=MAX_SCAN_AGE):
+        self.images_dir = images_dir
+        self.max_age = max_age
+        self.scans = 0
+        self.skips = 0
+        self._fingerprint = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_fingerprint(self, catalog_version):
+        try:
+            mtime = os.stat(self.images_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        return (mtime, catalog_version())
+
+    def run_if_changed(self, scan, catalog_version=lambda: None):
+        # Executa scan() só se algo mudou desde a última varredura; retorna o resultado
+        # de scan() ou None. O lock evita que sessões simultâneas varram ao mesmo tempo.
+        with self._lock:
+            fresh = time.monotonic() - self._scanned_at < self.max_age
+            if fresh and self._current_fingerprint(catalog_version) == self._fingerprint:
+                self.skips += 1
+                return None
+            result = scan()
+            # Impressão digital após a varredura: as exclusões feitas por ela não
+            # disparam uma nova varredura
+            self._fingerprint = self._current_fingerprint(catalog_version)
+            self._scanned_at = time.monotonic()
+            self.scans += 1
+            return result
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import shutil
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Os nomes publicados derivam do conteúdo: uma URL nunca muda de conteúdo,
+# então o navegador pode guardá-la em cache por um ano sem revalidar
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+HASH_LENGTH = 16
+# Pasta "static" ao lado do app, servida pelo Streamlit com server.enableStaticServing
+# (st.image repassa ao navegador caminhos que começam com /app/static/)
+STREAMLIT_STATIC_URL = '/app/static'
+
+
+def content_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class StaticImagePublisher:
+    # Copia cada imagem para static_dir com o hash do conteúdo no nome e devolve a URL.
+    # O hash é calculado uma vez por versão do arquivo (caminho + mtime + tamanho).
+    def __init__(self, static_dir, base_url):
+        self.static_dir = static_dir
+        self.base_url = base_url.rstrip('/')
+        self.published = 0
+        self._urls = {}
+        self._lock = threading.Lock()
+        os.makedirs(static_dir, exist_ok=True)
+
+    def url(self, image_path, source=None):
+        # source: banner de onde image_path foi gerado (versão ou miniatura). A versão do
+        # memo é a do banner, pois o cache de miniaturas atualiza o mtime a cada acerto
+        stat = os.stat(source or image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            url = self._urls.get(key)
+        if url is not None:
+            return url
+
+        extension = os.path.splitext(image_path)[1].lower()
+        name = content_hash(image_path) + extension
+        target = os.path.join(self.static_dir, name)
+        if not os.path.exists(target):
+            tmp_path = f"{target}.{threading.get_ident()}.tmp"
+            shutil.copyfile(image_path, tmp_path)
+            os.replace(tmp_path, target)
+            self.published += 1
+
+        url = f"{self.base_url}/{name}"
+        with self._lock:
+            self._urls[key] = url
+        return url
+
+
+class _ImmutableFileHandler(SimpleHTTPRequestHandler):
+    _status = None
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def end_headers(self):
+        # Só respostas 200 podem ir para o cache por um ano: um 404 guardado como
+        # immutable continuaria valendo mesmo depois de a imagem ser publicada
+        if self._status == 200:
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+        super().end_headers()
+
+    def list_directory(self, path):
+        self.send_error(404)
+        return None
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_static_server(static_dir, host='127.0.0.1', port=8502):
+    # Servidor local para as imagens publicadas, com cabeçalhos de cache longos
+    # (o static serving do Streamlit só permite revalidação por ETag). Por padrão só
+    # escuta em localhost: para expor, use um proxy reverso ou passe host explicitamente
+    os.makedirs(static_dir, exist_ok=True)
+    handler = partial(_ImmutableFileHandler, directory=static_dir)
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_configured_server(static_dir, config):
+    # Servidor da seção [static_images] dos secrets; devolve a URL base das imagens.
+    # host e base_url são obrigatórios: com os padrões (127.0.0.1, localhost) as URLs
+    # só funcionariam num navegador aberto no próprio servidor
+    missing = [key for key in ('host', 'base_url') if not config.get(key)]
+    if missing:
+        raise ValueError(f"[static_images] com port exige também {' e '.join(missing)}: "
+                         "o endereço em que o servidor escuta e a URL pública usada pelo navegador")
+    start_static_server(static_dir, host=config['host'], port=int(config['port']))
+    return config['base_url']
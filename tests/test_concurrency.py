@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+
+from storage import ExcelRepository, SQLRepository
+
+SLOTS = 25
+PROCESSES = 6
+THREADS = 4
+ATTEMPTS = 10
+
+
+def open_repository(backend, path):
+    if backend == 'excel':
+        return ExcelRepository(f"{path}/courses.xlsx", f"{path}/registrations.xlsx")
+    # timeout: as escritas concorrentes esperam o lock do SQLite em vez de falhar
+    return SQLRepository(create_engine(f"sqlite:///{path}/training.db", connect_args={'timeout': 30}))
+
+
+def reserve_in_threads(backend, path, course_id):
+    # Um processo: THREADS threads tentando ATTEMPTS reservas cada; retorna os sucessos
+    repository = open_repository(backend, path)
+    successes = []
+    lock = threading.Lock()
+
+    def attempt():
+        for _ in range(ATTEMPTS):
+            if repository.reserve_seat(course_id):
+                with lock:
+                    successes.append(1)
+
+    threads = [threading.Thread(target=attempt) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(successes)
+
+
+@pytest.mark.parametrize('backend', ['excel', 'sqlite'])
+def test_reservations_never_exceed_slots(backend, tmp_path):
+    # PROCESSES x THREADS x ATTEMPTS tentativas (240) disputando SLOTS vagas
+    repository = open_repository(backend, tmp_path)
+    course_id = repository.add_course({'name': 'Excel', 'description': '', 'slots': SLOTS,
+                                       'image_path': '', 'registered': 0, 'status': 'open'})
+
+    with ProcessPoolExecutor(PROCESSES) as pool:
+        futures = [pool.submit(reserve_in_threads, backend, str(tmp_path), int(course_id))
+                   for _ in range(PROCESSES)]
+        successes = sum(future.result() for future in futures)
+
+    assert successes == SLOTS
+    assert repository.load_courses()['registered'].tolist() == [SLOTS]
@@ -0,0 +1,34 @@
+import os
+
+from PIL import Image
+
+from image_cache import ThumbnailCache
+
+
+def make_image(tmp_path):
+    image_path = str(tmp_path / 'banner.png')
+    Image.new('RGB', (800, 600), 'navy').save(image_path)
+    return image_path
+
+
+def test_memory_hit_refreshes_mtime(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / '.thumbnails'))
+    image_path = make_image(tmp_path)
+    thumbnail = cache.get(image_path)
+    os.utime(thumbnail, (0, 0))
+
+    assert cache.get(image_path) == thumbnail
+    # A limpeza por idade (integrity) olha o mtime: um acerto em memória conta como uso
+    assert os.stat(thumbnail).st_mtime > 0
+    assert cache.hits == 1
+
+
+def test_memory_hit_rebuilds_deleted_thumbnail(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / '.thumbnails'))
+    image_path = make_image(tmp_path)
+    thumbnail = cache.get(image_path)
+    os.remove(thumbnail)
+
+    assert cache.get(image_path) == thumbnail
+    assert os.path.exists(thumbnail)
+    assert cache.misses == 2
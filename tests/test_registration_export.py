@@ -0,0 +1,23 @@
+import tempfile
+from datetime import datetime
+
+from registration_log import append_registrations
+from registration_export import deferred_export
+
+
+def test_deferred_export_runs_on_click_and_removes_the_file(tmp_path, monkeypatch):
+    export_dir = tmp_path / 'exports'
+    export_dir.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(export_dir))
+    snapshot_path = str(tmp_path / 'registrations.xlsx')
+    append_registrations(snapshot_path, [
+        {'course_id': 1, 'course_name': 'Excel', 'name': 'Ana', 'cpf': '52998224725',
+         'email': 'ana@exemplo.com', 'company': 'ACME', 'registration_date': datetime(2025, 1, 1)},
+    ])
+
+    generate = deferred_export(snapshot_path, 'CSV', course_name='Excel')
+    assert list(export_dir.iterdir()) == []
+
+    data = generate()
+    assert b'Ana' in data and data.startswith(b'\xef\xbb\xbfcourse_id')
+    assert list(export_dir.iterdir()) == []
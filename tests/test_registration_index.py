@@ -0,0 +1,50 @@
+import pandas as pd
+
+from registration_index import duplicate_report
+
+
+def registrations(*rows):
+    return pd.DataFrame([
+        {'course_id': course_id, 'course_name': 'Excel', 'name': name, 'cpf': cpf, 'email': email,
+         'company': 'ACME', 'registration_date': pd.Timestamp('2025-01-01')}
+        for course_id, name, cpf, email in rows
+    ])
+
+
+def test_no_duplicates():
+    report = duplicate_report(registrations(
+        (1, 'Ana', '52998224725', 'ana@exemplo.com'),
+        (1, 'Bia', '11144477735', 'bia@exemplo.com'),
+        (2, 'Ana', '52998224725', 'ana@exemplo.com'),
+    ))
+    assert report.empty
+    assert 'duplicate_on' in report.columns
+
+
+def test_duplicate_cpf_only():
+    report = duplicate_report(registrations(
+        (1, 'Ana', '529.982.247-25', 'ana@exemplo.com'),
+        (1, 'Ana B', '52998224725', 'ana.b@exemplo.com'),
+        (1, 'Bia', '11144477735', 'bia@exemplo.com'),
+    ))
+    assert report['name'].tolist() == ['Ana', 'Ana B']
+    assert report['duplicate_on'].tolist() == ['cpf', 'cpf']
+
+
+def test_duplicate_email_only():
+    report = duplicate_report(registrations(
+        (1, 'Ana', '52998224725', 'Ana@Exemplo.com '),
+        (1, 'Bia', '11144477735', 'ana@exemplo.com'),
+    ))
+    assert sorted(report['name']) == ['Ana', 'Bia']
+    assert report['duplicate_on'].tolist() == ['email', 'email']
+
+
+def test_duplicate_cpf_and_email():
+    report = duplicate_report(registrations(
+        (1, 'Ana', '52998224725', 'ana@exemplo.com'),
+        (1, 'Ana', '529.982.247-25', 'ANA@exemplo.com'),
+        (2, 'Bia', '11144477735', 'bia@exemplo.com'),
+    ))
+    assert report['name'].tolist() == ['Ana', 'Ana']
+    assert report['duplicate_on'].tolist() == ['cpf, email', 'cpf, email']
@@ -0,0 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+
+import registration_log
+from registration_log import append_registrations, compact, load_registrations
+
+PROCESSES = 4
+BATCHES = 15
+BATCH_SIZE = 5
+
+
+def append_and_compact(snapshot_path, worker):
+    # Um processo: grava BATCHES lotes e compacta depois de cada um, disputando a
+    # troca snapshot/segmento com os outros processos
+    for batch in range(BATCHES):
+        append_registrations(snapshot_path, [
+            {'course_id': 1, 'course_name': 'Excel', 'name': f"{worker}-{batch}-{index}",
+             'cpf': f"{worker:03d}{batch:04d}{index:04d}", 'email': f"{worker}.{batch}.{index}@exemplo.com",
+             'company': 'ACME', 'registration_date': datetime.now()}
+            for index in range(BATCH_SIZE)
+        ])
+        compact(snapshot_path)
+    return BATCHES * BATCH_SIZE
+
+
+@pytest.mark.parametrize('extension', ['.xlsx', '.parquet'])
+def test_compaction_across_processes_keeps_every_row(extension, tmp_path, monkeypatch):
+    # Sem compactação automática nas threads: cada processo compacta explicitamente
+    monkeypatch.setattr(registration_log, 'COMPACT_THRESHOLD', 10 ** 9)
+    snapshot_path = str(tmp_path / f"registrations{extension}")
+
+    with ProcessPoolExecutor(PROCESSES) as pool:
+        futures = [pool.submit(append_and_compact, snapshot_path, worker) for worker in range(PROCESSES)]
+        written = sum(future.result() for future in futures)
+
+    registrations = load_registrations(snapshot_path)
+    assert len(registrations) == written
+    assert registrations['name'].is_unique
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from registration_index import RegistrationIndex
+from roster_import import import_roster, read_roster
+from storage import ExcelRepository, SQLRepository
+
+ROSTER = (b"nome;cpf;email;empresa\n"
+          b"Ana;529.982.247-25;Ana@Empresa.com;Empresa\n"
+          b"Bruno;111.444.777-35;bruno@empresa.com;Empresa\n")
+
+
+@pytest.fixture(params=['excel', 'sqlite'])
+def repository(request, tmp_path):
+    if request.param == 'excel':
+        return ExcelRepository(str(tmp_path / 'courses.xlsx'), str(tmp_path / 'registrations.xlsx'))
+    return SQLRepository(create_engine(f"sqlite:///{tmp_path / 'training.db'}"))
+
+
+def make_course(repository, slots=5):
+    repository.add_course({'name': 'Excel', 'description': '', 'slots': slots,
+                           'image_path': '', 'registered': 0, 'status': 'open'})
+    return repository.load_courses().iloc[0]
+
+
+def test_import_stores_cpf_digits(repository):
+    course = make_course(repository)
+    imported, errors = import_roster(repository, course, read_roster(ROSTER, 'lista.csv'))
+    assert errors.empty
+    stored = repository.load_registrations()
+    assert sorted(stored['cpf']) == ['11144477735', '52998224725']
+    assert sorted(stored['email']) == ['ana@empresa.com', 'bruno@empresa.com']
+    assert repository.load_courses()['registered'].tolist() == [2]
+
+
+def test_failed_write_gives_back_seats_and_claims(repository, monkeypatch):
+    course = make_course(repository)
+    index = RegistrationIndex.from_registrations(pd.DataFrame())
+
+    def failing_insert(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    if isinstance(repository, SQLRepository):
+        monkeypatch.setattr(repository, '_registration_values', failing_insert)
+    else:
+        monkeypatch.setattr(repository, 'add_registrations', failing_insert)
+
+    with pytest.raises(OSError):
+        import_roster(repository, course, read_roster(ROSTER, 'lista.csv'), registration_index=index)
+    assert repository.load_courses()['registered'].tolist() == [0]
+    assert repository.load_registrations().empty
+    assert index.find(course['id'], '52998224725', 'ana@empresa.com') is None
+
+
+def test_not_enough_seats_writes_nothing(repository):
+    course = make_course(repository, slots=1)
+    index = RegistrationIndex.from_registrations(pd.DataFrame())
+    with pytest.raises(ValueError):
+        import_roster(repository, course, read_roster(ROSTER, 'lista.csv'), registration_index=index)
+    assert repository.load_courses()['registered'].tolist() == [0]
+    assert index.find(course['id'], '52998224725', 'ana@empresa.com') is None
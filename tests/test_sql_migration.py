@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from registration_log import append_registrations
+from sql_migration import migrate_to_sql
+from storage import ExcelRepository, SQLRepository
+
+REGISTRATIONS = 25
+
+
+@pytest.fixture
+def source(tmp_path):
+    # Base Excel antiga: CPFs formatados e emails com maiúsculas
+    courses_path = str(tmp_path / 'courses.xlsx')
+    registrations_path = str(tmp_path / 'registrations.xlsx')
+    repository = ExcelRepository(courses_path, registrations_path)
+    repository.add_course({'name': 'Excel', 'description': '', 'slots': 50,
+                           'image_path': '', 'registered': REGISTRATIONS, 'status': 'open'})
+    start = datetime(2025, 1, 1)
+    append_registrations(registrations_path, [
+        {'course_id': 1, 'course_name': 'Excel', 'name': f"Pessoa {index}",
+         'cpf': f"529.982.{index:03d}-25", 'email': f"Pessoa{index}@Empresa.com",
+         'company': 'ACME', 'registration_date': start + timedelta(minutes=index)}
+        for index in range(REGISTRATIONS)
+    ])
+    return courses_path, registrations_path
+
+
+def test_migration_normalizes_legacy_cpfs_and_resumes(source, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'training.db'}")
+
+    def interrupt(table, done, total):
+        if table == 'registrations' and done >= 10:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        migrate_to_sql(engine, *source, batch_size=10, progress=interrupt)
+    resumed = migrate_to_sql(engine, *source, batch_size=10)
+    rerun = migrate_to_sql(engine, *source, batch_size=10)
+
+    assert resumed == {'courses': 0, 'registrations': REGISTRATIONS - 10}
+    assert rerun == {'courses': 0, 'registrations': 0}
+    registrations = SQLRepository(engine).load_registrations()
+    assert len(registrations) == REGISTRATIONS
+    assert registrations['cpf'].str.fullmatch(r'\d{11}').all()
+    assert (registrations['email'] == registrations['email'].str.lower()).all()
+    assert set(registrations['course_id']) == {1}
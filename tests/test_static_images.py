@@ -0,0 +1,101 @@
+import os
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+import static_images
+from image_cache import ThumbnailCache
+from image_pipeline import RENDITIONS
+from integrity import IntegrityChecker
+from static_images import CACHE_CONTROL, StaticImagePublisher, start_configured_server, start_static_server
+
+
+class CoursesStub:
+    def __init__(self, courses):
+        self.courses = courses
+
+    def load_courses(self):
+        return pd.DataFrame(self.courses)
+
+    def update_course(self, course_id, updates):
+        return False
+
+
+def make_image(path, color):
+    Image.new('RGB', (40, 30), color).save(path)
+    return str(path)
+
+
+def test_cache_headers_only_on_success(tmp_path):
+    publisher = StaticImagePublisher(str(tmp_path / 'banners'), 'http://127.0.0.1')
+    name = publisher.url(make_image(tmp_path / 'banner.png', 'navy')).rsplit('/', 1)[1]
+    server = start_static_server(publisher.static_dir, port=0)
+    try:
+        assert server.server_address[0] == '127.0.0.1'
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base_url}/{name}") as response:
+            assert response.headers['Cache-Control'] == CACHE_CONTROL
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/ausente.png")
+        assert error.value.code == 404
+        assert error.value.headers['Cache-Control'] is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_integrity_prunes_published_copies_of_replaced_banners(tmp_path):
+    images_dir = tmp_path / 'images'
+    images_dir.mkdir()
+    publisher = StaticImagePublisher(str(tmp_path / 'banners'), '/app/static/banners')
+    old_banner = make_image(images_dir / 'old.png', 'navy')
+    new_banner = make_image(images_dir / 'new.png', 'teal')
+    old_name = publisher.url(old_banner).rsplit('/', 1)[1]
+    new_name = publisher.url(new_banner).rsplit('/', 1)[1]
+    # O curso trocou de banner: só o novo continua referenciado
+    courses = CoursesStub([{'id': 1, 'name': 'Excel', 'image_path': new_banner, 'status': 'open'}])
+    checker = IntegrityChecker(courses, str(images_dir), static_dir=publisher.static_dir, grace_period=0)
+
+    report = checker.run_once()
+
+    assert os.path.join(publisher.static_dir, old_name) in report['removed_files']
+    assert sorted(os.listdir(publisher.static_dir)) == [new_name]
+
+
+def test_thumbnail_url_is_memoized_on_the_banner_version(tmp_path, monkeypatch):
+    banner = make_image(tmp_path / 'banner.png', 'navy')
+    thumbnails = ThumbnailCache(str(tmp_path / '.thumbnails'))
+    publisher = StaticImagePublisher(str(tmp_path / 'banners'), '/app/static/banners')
+    hashed = []
+    monkeypatch.setattr(static_images, 'content_hash', lambda path: hashed.append(path) or 'abc123')
+
+    # Cada render: acerto no cache de miniaturas (que toca o arquivo) e publicação
+    urls = {publisher.url(thumbnails.get(banner, (20, 15)), source=banner) for _ in range(5)}
+
+    assert len(urls) == 1
+    assert len(hashed) == 1
+
+
+def test_integrity_keeps_published_thumbnails_of_current_banners(tmp_path):
+    images_dir = tmp_path / 'images'
+    images_dir.mkdir()
+    banner = make_image(images_dir / 'legacy.png', 'navy')
+    thumbnails = ThumbnailCache(str(images_dir / '.thumbnails'))
+    publisher = StaticImagePublisher(str(tmp_path / 'banners'), '/app/static/banners')
+    published = [publisher.url(thumbnails.get(banner, (width, height)), source=banner).rsplit('/', 1)[1]
+                 for width, height, _ in RENDITIONS.values()]
+    courses = CoursesStub([{'id': 1, 'name': 'Excel', 'image_path': banner, 'status': 'open'}])
+    checker = IntegrityChecker(courses, str(images_dir), static_dir=publisher.static_dir, grace_period=0)
+
+    assert checker.run_once()['removed_files'] == []
+    assert sorted(os.listdir(publisher.static_dir)) == sorted(published)
+
+
+def test_configured_server_requires_host_and_base_url(tmp_path):
+    with pytest.raises(ValueError, match='host e base_url'):
+        start_configured_server(str(tmp_path / 'banners'), {'port': 0})
+    with pytest.raises(ValueError, match='base_url'):
+        start_configured_server(str(tmp_path / 'banners'), {'port': 0, 'host': '127.0.0.1'})
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from storage import ExcelRepository, ParquetRepository, SQLRepository
+
+
+@pytest.fixture
+def sql_repository(tmp_path):
+    return SQLRepository(create_engine(f"sqlite:///{tmp_path / 'training.db'}"))
+
+
+def add_course(repository, name='Excel', slots=1):
+    course_id = repository.add_course({'name': name, 'description': '', 'slots': slots,
+                                       'image_path': '', 'registered': 0, 'status': 'open'})
+    # Como nas páginas: o id lido do DataFrame de cursos é numpy.int64
+    courses = repository.load_courses()
+    return courses.loc[courses['id'] == course_id, 'id'].iloc[0]
+
+
+def registration(course_id, course_name, cpf='52998224725', email='ana@empresa.com'):
+    return {'course_id': course_id, 'course_name': course_name, 'name': 'Ana', 'cpf': cpf,
+            'email': email, 'company': 'Empresa', 'registration_date': datetime.now()}
+
+
+def test_sql_repository_accepts_numpy_ids(sql_repository):
+    course_id = add_course(sql_repository)
+    target_id = add_course(sql_repository, name='Python')
+    assert isinstance(course_id, np.int64)
+
+    assert sql_repository.reserve_seat(course_id)
+    sql_repository.add_registration(registration(course_id, 'Excel'))
+    assert not sql_repository.reserve_seat(course_id)
+
+    moved, new = sql_repository.transfer_registration(course_id, '52998224725', 'ana@empresa.com', target_id)
+    assert len(moved) == 1 and new['course_id'] == target_id
+    assert len(sql_repository.cancel_registration(target_id, '52998224725', 'ana@empresa.com')) == 1
+
+    assert sql_repository.update_course(course_id, {'slots': 5})
+    courses = sql_repository.load_courses().set_index('id')
+    assert courses.loc[course_id, 'slots'] == 5
+    assert courses['registered'].tolist() == [0, 0]
+    assert sql_repository.delete_course(course_id)
+    assert sql_repository.load_courses()['id'].tolist() == [target_id]
+
+
+@pytest.fixture(params=['excel', 'parquet', 'sqlite'])
+def repository(request, tmp_path):
+    if request.param == 'excel':
+        return ExcelRepository(str(tmp_path / 'courses.xlsx'), str(tmp_path / 'registrations.xlsx'))
+    if request.param == 'parquet':
+        return ParquetRepository(str(tmp_path / 'courses.parquet'), str(tmp_path / 'registrations.parquet'))
+    return SQLRepository(create_engine(f"sqlite:///{tmp_path / 'training.db'}"))
+
+
+def test_cancel_matches_cpf_digits_on_every_backend(repository):
+    course_id = add_course(repository)
+    assert repository.reserve_seat(course_id)
+    repository.add_registration(registration(course_id, 'Excel', cpf='529.982.247-25'))
+
+    cancelled = repository.cancel_registration(course_id, '52998224725', 'ANA@empresa.com')
+    assert len(cancelled) == 1
+    assert repository.load_registrations().empty
+    assert repository.load_courses()['registered'].tolist() == [0]
+
+
+def test_transfer_duplicate_rule_is_cpf_or_email_on_every_backend(repository):
+    course_id = add_course(repository)
+    target_id = add_course(repository, name='Python', slots=2)
+    assert repository.reserve_seats(course_id, 1) and repository.reserve_seats(target_id, 1)
+    repository.add_registrations([
+        registration(course_id, 'Excel'),
+        # Mesmo email, outro CPF, já inscrito no destino
+        registration(target_id, 'Python', cpf='11144477735'),
+    ])
+
+    with pytest.raises(ValueError):
+        repository.transfer_registration(course_id, '52998224725', 'ana@empresa.com', target_id)
+    assert sorted(repository.load_courses()['registered'].tolist()) == [1, 1]
+    assert len(repository.load_registrations()) == 2
+
+
+def test_release_seats_never_goes_below_zero(repository):
+    course_id = add_course(repository, slots=3)
+    assert repository.reserve_seats(course_id, 2)
+
+    assert repository.release_seats(course_id, 5)
+    assert repository.load_courses()['registered'].tolist() == [0]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from registration_index import RegistrationIndex
+from storage import ExcelRepository
+from waitlist import Waitlist, waitlist_path_for
+
+
+def person(name, cpf):
+    return {'course_name': 'Excel', 'name': name, 'cpf': cpf, 'email': f'{name.lower()}@empresa.com',
+            'company': 'Empresa'}
+
+
+def make_repository(tmp_path, slots):
+    repository = ExcelRepository(str(tmp_path / 'courses.xlsx'), str(tmp_path / 'registrations.xlsx'))
+    course_id = repository.add_course({'name': 'Excel', 'description': '', 'slots': slots,
+                                       'image_path': '', 'registered': slots, 'status': 'open'})
+    return repository, course_id
+
+
+def register(repository, course_id, entry):
+    assert repository.reserve_seat(course_id)
+    repository.add_registration({**entry, 'course_id': course_id, 'registration_date': datetime.now()})
+
+
+def test_promote_skips_people_already_registered(tmp_path):
+    repository, course_id = make_repository(tmp_path, slots=1)
+    waitlist = Waitlist(waitlist_path_for(repository.registrations_path))
+    bob, carla = person('Bob', '52998224725'), person('Carla', '11144477735')
+    assert waitlist.join(course_id, bob) == 1
+    assert waitlist.join(course_id, carla) == 2
+
+    # Mais vagas; Bob se inscreve pelo formulário antes da promoção (sem passar por leave)
+    repository.update_course(course_id, {'slots': 3})
+    register(repository, course_id, bob)
+
+    index = RegistrationIndex.from_registrations(repository.load_registrations())
+    promoted = waitlist.promote(repository, course_id, registration_index=index)
+    assert [registration['name'] for registration in promoted] == ['Carla']
+    assert waitlist.size(course_id) == 0
+    assert repository.load_courses()['registered'].tolist() == [3]
+    assert sorted(repository.load_registrations()['name']) == ['Bob', 'Carla']
+
+
+def test_direct_registration_leaves_the_waitlist(tmp_path):
+    repository, course_id = make_repository(tmp_path, slots=1)
+    waitlist = Waitlist(waitlist_path_for(repository.registrations_path))
+    bob = person('Bob', '52998224725')
+    waitlist.join(course_id, bob)
+
+    repository.update_course(course_id, {'slots': 2})
+    register(repository, course_id, bob)
+    assert waitlist.leave(course_id, [{**bob, 'email': 'BOB@empresa.com '}]) == 1
+    assert waitlist.size(course_id) == 0
+    assert waitlist.promote(repository, course_id) == []
+    assert repository.load_courses()['registered'].tolist() == [2]
+
+
+def test_failed_promotion_gives_back_seats_and_claims(tmp_path, monkeypatch):
+    repository, course_id = make_repository(tmp_path, slots=1)
+    waitlist = Waitlist(waitlist_path_for(repository.registrations_path))
+    bob = person('Bob', '52998224725')
+    waitlist.join(course_id, bob)
+    repository.update_course(course_id, {'slots': 2})
+
+    def failing_write(registrations):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(repository, 'add_registrations', failing_write)
+    index = RegistrationIndex()
+    with pytest.raises(OSError):
+        waitlist.promote(repository, course_id, registration_index=index)
+
+    assert repository.load_courses()['registered'].tolist() == [1]
+    assert index.find(course_id, bob['cpf'], bob['email']) is None
+    assert waitlist.size(course_id) == 1
@@ -0,0 +1,157 @@
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Mesmo padrão usado pelos formulários de inscrição, compilado uma vez por processo
+EMAIL_PATTERN = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+# Pesos dos dois dígitos verificadores do CPF
+_FIRST_WEIGHTS = np.arange(10, 1, -1)
+_SECOND_WEIGHTS = np.arange(11, 1, -1)
+
+# Posições dos dígitos nos dois formatos mais comuns: "12345678909" e "123.456.789-09"
+_PLAIN_DIGITS = list(range(11))
+_FORMATTED_DIGITS = [0, 1, 2, 4, 5, 6, 8, 9, 10, 12, 13]
+_FORMATTED_SEPARATORS = ([3, 7, 11], np.frombuffer(b'..-', dtype=np.uint8))
+
+
+def validate_cpf(cpf):
+    # Versão escalar para o formulário: 11 dígitos, não repetidos e verificadores corretos
+    digits = [int(char) for char in str(cpf) if char in '0123456789']
+    if len(digits) != 11 or len(set(digits)) == 1:
+        return False
+    first = sum(weight * digit for weight, digit in zip(range(10, 1, -1), digits)) * 10 % 11 % 10
+    second = sum(weight * digit for weight, digit in zip(range(11, 1, -1), digits)) * 10 % 11 % 10
+    return digits[9] == first and digits[10] == second
+
+
+def normalize_cpf(cpf):
+    # Forma canônica gravada nas inscrições: só os dígitos ("529.982.247-25" -> "52998224725")
+    return ''.join(char for char in str(cpf) if char in '0123456789')
+
+
+def normalize_email(email):
+    # Forma canônica gravada nas inscrições e usada como chave de duplicidade
+    return str(email).strip().lower()
+
+
+def email_domain(email):
+    return normalize_email(email).rpartition('@')[2]
+
+
+def validate_email(email):
+    return _EMAIL_RE.match(normalize_email(email)) is not None
+
+
+def _as_text(values):
+    return pd.Series(values, dtype='string').fillna('')
+
+
+def _char_matrix(texts, width):
+    # Bytes ASCII de cada texto numa matriz n x width; None se houver outro caractere
+    try:
+        raw = texts.astype(f'S{width}')
+    except UnicodeEncodeError:
+        return None
+    return np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, width)
+
+
+def _digit_matrix(cpfs):
+    # Matriz n x 11 com os dígitos de cada CPF e a máscara dos que têm 11 dígitos.
+    # Os formatos comuns são convertidos direto dos bytes; o restante passa pela
+    # remoção de não dígitos com regex (só para essas linhas).
+    text = _as_text(cpfs).str.strip()
+    raw = text.to_numpy(dtype=object)
+    lengths = text.str.len().to_numpy()
+    matrix = np.zeros((len(raw), 11), dtype=np.int64)
+    found = np.zeros(len(raw), dtype=bool)
+    pending = np.ones(len(raw), dtype=bool)
+
+    for width, columns in ((11, _PLAIN_DIGITS), (14, _FORMATTED_DIGITS)):
+        rows = np.flatnonzero(lengths == width)
+        chars = _char_matrix(raw[rows], width) if len(rows) else None
+        if chars is None:
+            continue
+        digits = chars[:, columns].astype(np.int64) - ord('0')
+        ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+        if width == 14:
+            positions, separators = _FORMATTED_SEPARATORS
+            ok &= (chars[:, positions] == separators).all(axis=1)
+        matrix[rows[ok]] = digits[ok]
+        found[rows[ok]] = True
+        pending[rows[ok]] = False
+
+    rows = np.flatnonzero(pending)
+    if len(rows):
+        stripped = text.iloc[rows].str.replace(r'[^0-9]', '', regex=True)
+        has_11 = stripped.str.len().to_numpy() == 11
+        if has_11.any():
+            chars = _char_matrix(stripped.to_numpy(dtype=object)[has_11], 11)
+            matrix[rows[has_11]] = chars.astype(np.int64) - ord('0')
+            found[rows[has_11]] = True
+    return matrix, found
+
+
+def valid_cpfs(cpfs):
+    # Validação de uma coluna inteira: os verificadores são calculados com produtos
+    # matriciais sobre a matriz de dígitos, sem laço por CPF
+    cpfs = pd.Series(cpfs)
+    matrix, found = _digit_matrix(cpfs)
+    first = (matrix[:, :9] @ _FIRST_WEIGHTS * 10) % 11 % 10
+    second = ((matrix[:, :9] @ _SECOND_WEIGHTS[:9] + first * _SECOND_WEIGHTS[9]) * 10) % 11 % 10
+    # 000.000.000-00, 111.111.111-11 etc. passam no cálculo, mas não são CPFs válidos
+    repeated = (matrix == matrix[:, :1]).all(axis=1)
+    result = found & ~repeated & (matrix[:, 9] == first) & (matrix[:, 10] == second)
+    return pd.Series(result, index=cpfs.index)
+
+
+def normalize_cpfs(cpfs):
+    return _as_text(cpfs).str.replace(r'[^0-9]', '', regex=True)
+
+
+def normalize_emails(emails):
+    # Versões em lote: uma operação por coluna em vez de uma chamada por email
+    return _as_text(emails).str.strip().str.lower()
+
+
+def email_domains(emails):
+    return normalize_emails(emails).str.rpartition('@')[2]
+
+
+def valid_emails(emails):
+    emails = pd.Series(emails)
+    matches = normalize_emails(emails).str.match(_EMAIL_RE)
+    return pd.Series(matches.to_numpy(dtype=bool), index=emails.index)
+
+
+def _random_cpfs(count, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 10, (count, 9))
+    first = (base @ _FIRST_WEIGHTS * 10) % 11 % 10
+    second = ((base @ _SECOND_WEIGHTS[:9] + first * _SECOND_WEIGHTS[9]) * 10) % 11 % 10
+    digits = np.column_stack([base, first, second]).astype(np.uint8) + ord('0')
+    return pd.Series(digits.view('S11').ravel().astype(str))
+
+
+def benchmark(count=1_000_000):
+    # python validators.py [quantidade]: vazão das duas APIs com CPFs só com dígitos
+    # (auditoria do histórico) e formatados (listas enviadas pelas empresas)
+    plain = _random_cpfs(count)
+    formatted = plain.str[:3] + '.' + plain.str[3:6] + '.' + plain.str[6:9] + '-' + plain.str[9:]
+    scalar_sample = plain.iloc[:min(count, 100_000)]
+    start = time.perf_counter()
+    assert all(validate_cpf(cpf) for cpf in scalar_sample)
+    elapsed = time.perf_counter() - start
+    print(f"validate_cpf (escalar):   {len(scalar_sample) / elapsed:>12,.0f} CPFs/s")
+    for label, cpfs in (('apenas dígitos', plain), ('formatados', formatted)):
+        start = time.perf_counter()
+        assert valid_cpfs(cpfs).all()
+        elapsed = time.perf_counter() - start
+        print(f"valid_cpfs ({label}): {count / elapsed:>12,.0f} CPFs/s")
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,223 @@
+import os
+import json
+import uuid
+from collections import deque
+from datetime import datetime
+import pandas as pd
+from locks import file_lock
+from registration_index import course_keys, cpf_key, cpf_keys, email_key, email_keys
+from validators import normalize_cpf, normalize_email
+
+WAITLIST_COLUMNS = ['course_id', 'course_name', 'name', 'cpf', 'email', 'company', 'joined_at']
+
+# Entradas já promovidas no log antes de reescrevê-lo só com as pendentes
+COMPACT_THRESHOLD = 500
+
+
+def waitlist_path_for(registrations_path):
+    return os.path.splitext(registrations_path)[0] + '.waitlist.jsonl'
+
+
+class Waitlist:
+    # Fila de espera FIFO por curso. O log JSONL (entradas e promoções) é a fonte da
+    # verdade entre processos; cada processo mantém uma deque por curso e lê só as
+    # linhas novas do log. Toda operação roda sob o lock do arquivo.
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self._queues = {}
+        self._keys = set()
+        self._file_id = None
+        self._offset = 0
+        self._finished = 0
+
+    def _reset(self):
+        self._queues = {}
+        self._keys = set()
+        self._offset = 0
+        self._finished = 0
+
+    def _entry_keys(self, entry):
+        course_id = int(entry['course_id'])
+        return (course_id, 'cpf', cpf_key(entry['cpf'])), (course_id, 'email', email_key(entry['email']))
+
+    def _apply(self, record):
+        if record['op'] == 'join':
+            self._queues.setdefault(int(record['course_id']), deque()).append(record)
+            self._keys.update(self._entry_keys(record))
+            return
+        # 'promote', 'skip' (já inscrito) ou 'leave' (inscrição direta): sai da fila.
+        # A promoção sempre consome a cabeça da fila, então o caso comum é O(1)
+        queue = self._queues.get(int(record['course_id']))
+        if not queue:
+            return
+        if queue[0]['id'] == record['id']:
+            entry = queue.popleft()
+        else:
+            entry = next((item for item in queue if item['id'] == record['id']), None)
+            if entry is None:
+                return
+            queue.remove(entry)
+        self._keys.difference_update(self._entry_keys(entry))
+        self._finished += 1
+
+    def _sync(self):
+        # Aplica as linhas escritas por outros processos desde a última leitura;
+        # um log reescrito pela compactação (outro arquivo) é relido do início
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            self._file_id = None
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            self._reset()
+            self._file_id = file_id
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Linha ainda incompleta: lida na próxima sincronização
+                    break
+                self._offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    continue
+
+    def _append(self, records):
+        lines = ''.join(json.dumps(record, default=str, ensure_ascii=False) + '\n' for record in records)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        # As linhas acabaram de ser escritas por este processo: aplicar via _sync
+        self._sync()
+
+    def _compact(self):
+        pending = [entry for queue in self._queues.values() for entry in queue]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in pending:
+                f.write(json.dumps(entry, default=str, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._sync()
+
+    def join(self, course_id, entry):
+        # Entra no fim da fila (O(1)); retorna a posição ou None se a pessoa (CPF ou
+        # email) já está na fila deste curso
+        record = {'op': 'join', 'id': uuid.uuid4().hex, **entry, 'course_id': int(course_id),
+                  'cpf': normalize_cpf(entry['cpf']), 'email': normalize_email(entry['email']),
+                  'joined_at': datetime.now()}
+        with file_lock(self.lock_path):
+            self._sync()
+            if any(key in self._keys for key in self._entry_keys(record)):
+                return None
+            self._append([record])
+            return len(self._queues[int(course_id)])
+
+    def size(self, course_id):
+        with file_lock(self.lock_path):
+            self._sync()
+            return len(self._queues.get(int(course_id), ()))
+
+    def entries(self, course_id):
+        with file_lock(self.lock_path):
+            self._sync()
+            queue = list(self._queues.get(int(course_id), ()))
+        return pd.DataFrame(queue, columns=WAITLIST_COLUMNS)
+
+    def leave(self, course_id, registrations):
+        # Quem se inscreveu direto (formulário ou lista da empresa) sai da fila do curso
+        course_id = int(course_id)
+        with file_lock(self.lock_path):
+            self._sync()
+            queue = self._queues.get(course_id)
+            if not queue:
+                return 0
+            people = set()
+            for registration in registrations:
+                people.update(self._entry_keys({**registration, 'course_id': course_id}))
+            leaving = [entry for entry in queue if people.intersection(self._entry_keys(entry))]
+            if leaving:
+                self._append([{'op': 'leave', 'id': entry['id'], 'course_id': course_id} for entry in leaving])
+        return len(leaving)
+
+    def _enrolled(self, repository, course):
+        # CPFs e emails já inscritos no curso, lidos do repositório (vale entre processos)
+        registrations = repository.load_registrations()
+        if registrations.empty:
+            return set(), set()
+        in_course = course_keys(registrations).isin([int(course['id']), course['name']]).to_numpy()
+        registrations = registrations[in_course]
+        return set(cpf_keys(registrations['cpf'])), set(email_keys(registrations['email']))
+
+    def promote(self, repository, course_id, registration_index=None):
+        # Ocupa as vagas livres do curso com os primeiros da fila. Reserva de vagas,
+        # gravação das inscrições (repository.enroll) e registro da promoção acontecem sob o lock da fila,
+        # então duas sessões nunca promovem a mesma pessoa. Quem já tem inscrição no
+        # curso sai da fila sem ocupar vaga. Com registration_index, os promovidos são
+        # registrados no índice de duplicidade. Retorna as inscrições criadas.
+        course_id = int(course_id)
+        with file_lock(self.lock_path):
+            self._sync()
+            queue = self._queues.get(course_id)
+            if not queue:
+                return []
+            courses = repository.load_courses()
+            course = courses[courses['id'] == course_id]
+            if course.empty or course['status'].iloc[0] != 'open':
+                return []
+            course = course.iloc[0]
+            free = int(course['slots'] - course['registered'])
+            if free <= 0:
+                return []
+
+            enrolled_cpfs, enrolled_emails = self._enrolled(repository, course)
+            promoted, skipped = [], []
+            for entry in queue:
+                if len(promoted) == free:
+                    break
+                enrolled = cpf_key(entry['cpf']) in enrolled_cpfs or email_key(entry['email']) in enrolled_emails
+                if not enrolled and registration_index is not None:
+                    enrolled = registration_index.claim(course_id, entry['cpf'], entry['email']) is not None
+                (skipped if enrolled else promoted).append(entry)
+            if skipped:
+                self._append([{'op': 'skip', 'id': entry['id'], 'course_id': course_id} for entry in skipped])
+
+            registered_at = datetime.now()
+            registrations = [{
+                'course_id': course_id,
+                'course_name': course['name'],
+                'name': entry['name'],
+                'cpf': entry['cpf'],
+                'email': entry['email'],
+                'company': entry['company'],
+                'registration_date': registered_at,
+            } for entry in promoted]
+            # Reserva e gravação juntas (enroll): se a gravação falhar, as vagas voltam.
+            # O formulário da Library pode ocupar uma vaga ao mesmo tempo: tentar com menos
+            count = len(registrations)
+            enrolled = 0
+            try:
+                while count > 0 and not repository.enroll(course_id, registrations[:count]):
+                    count -= 1
+                enrolled = count
+            finally:
+                # Claims de quem ficou sem vaga (ou de todos, se a gravação falhou) voltam
+                if registration_index is not None:
+                    for entry in promoted[enrolled:]:
+                        registration_index.release(course_id, entry['cpf'], entry['email'])
+            if enrolled <= 0:
+                return []
+
+            promoted, registrations = promoted[:enrolled], registrations[:enrolled]
+            self._append([{'op': 'promote', 'id': entry['id'], 'course_id': course_id} for entry in promoted])
+            if self._finished >= COMPACT_THRESHOLD:
+                self._compact()
+        return registrations